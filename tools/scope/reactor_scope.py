@@ -11,17 +11,21 @@ Features:
 - Signal injection for testing
 - Black box history view
 - Performance statistics
+
+Requires Python 3.10+.
 """
 
 import sys
 import time
 import struct
 import json
+import csv
 from dataclasses import dataclass
 from typing import List, Dict, Optional, Deque
 from collections import deque
-from datetime import datetime
 import threading
+from array import array
+from bisect import bisect_left, bisect_right
 
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
@@ -29,12 +33,12 @@ from PySide6.QtWidgets import (
     QTableWidget, QTableWidgetItem, QHeaderView,
     QToolBar, QStatusBar, QLabel, QComboBox, QPushButton,
     QLineEdit, QSpinBox, QGroupBox, QFormLayout,
-    QTextEdit, QDockWidget, QMenu, QDialog, QDialogButtonBox,
+    QPlainTextEdit, QDockWidget, QMenu, QDialog, QDialogButtonBox,
     QMessageBox, QProgressBar, QFrame, QScrollArea, QScrollBar
 )
-from PySide6.QtCore import Qt, Signal, QTimer, QThread, QMutex, QPoint
+from PySide6.QtCore import Qt, Signal, QTimer, QThread, QMutex, QPoint, QLineF, QEvent
 from PySide6.QtGui import (
-    QAction, QPainter, QPen, QBrush, QColor, QFont,
+    QAction, QPainter, QPen, QBrush, QColor, QFont, QFontMetrics,
     QKeySequence, QPainterPath, QPolygon
 )
 
@@ -49,11 +53,30 @@ except ImportError:
 try:
     import pyqtgraph as pg
     HAS_PYQTGRAPH = True
-    pg.setConfigOptions(antialias=True)
+    try:
+        import OpenGL  # noqa: F401 - enables pyqtgraph's GPU curve path
+        pg.setConfigOptions(useOpenGL=True, enableExperimental=True, antialias=False)
+        HAS_OPENGL = True
+    except ImportError:
+        pg.setConfigOptions(antialias=True)
+        HAS_OPENGL = False
 except ImportError:
     HAS_PYQTGRAPH = False
+    HAS_OPENGL = False
     print("Warning: pyqtgraph not installed. Plotting features disabled.")
 
+try:
+    import numpy as np  # optional, used to vectorize Gantt geometry
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    import orjson  # optional, faster JSON export
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 
 # =============================================================================
 # i18n - Internationalization
@@ -144,7 +167,7 @@ def set_lang(lang: str):
 # Data Models
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class TraceEvent:
     """Single trace event"""
     timestamp_us: int
@@ -163,7 +186,19 @@ class TraceEvent:
     SIGNAL_RECV = 4
 
 
-@dataclass
+# Packed trace frame: event_type(B), entity_id(H), pad(H), data1(I), data2(I), timestamp(I)
+_TRACE_STRUCT = struct.Struct('<BHHIII')
+
+# Event types whose data1/data2 carry signal_id/src_id
+_SIGNAL_ID_EVENT_TYPES = frozenset({
+    TraceEvent.DISPATCH_START, TraceEvent.DISPATCH_END,
+    TraceEvent.SIGNAL_EMIT, TraceEvent.SIGNAL_RECV,
+})
+# Legacy signal trace events
+_SIGNAL_EVENT_TYPES = frozenset({TraceEvent.SIGNAL_EMIT, TraceEvent.SIGNAL_RECV})
+
+
+@dataclass(slots=True)
 class EntityStatus:
     """Entity runtime status"""
     id: int
@@ -176,7 +211,7 @@ class EntityStatus:
     last_dispatch_us: int
 
 
-@dataclass
+@dataclass(slots=True)
 class SignalRecord:
     """Recorded signal"""
     timestamp: float
@@ -196,7 +231,7 @@ class SignalRecord:
 class SerialWorker(QThread):
     """Background thread for serial communication"""
 
-    data_received = Signal(bytes)
+    data_batch_received = Signal(bytes)  # one or more packed trace frames
     connection_changed = Signal(bool)
     error_occurred = Signal(str)
     entity_name_received = Signal(int, str)   # entity_id, name
@@ -241,80 +276,85 @@ class SerialWorker(QThread):
 
         while self.running and self.port:
             try:
-                if self.port.in_waiting:
-                    data = self.port.read(self.port.in_waiting)
-                    buffer.extend(data)
-
-                    # Parse text-based trace messages: \x02UR:type,ent,d1,d2,ts\x03
-                    while True:
+                # Block (up to the port timeout) for the first byte, then take
+                # everything already waiting in one read
+                data = self.port.read(self.port.in_waiting or 1)
+                if not data:
+                    continue
+                buffer.extend(data)
+                frames = []
+
+                # Parse text-based trace messages: \x02UR:type,ent,d1,d2,ts\x03
+                while True:
+                    try:
+                        start = buffer.index(STX)
+                        end = buffer.index(ETX, start)
+                    except ValueError:
+                        # Keep only data after last STX if found
                         try:
-                            start = buffer.index(STX)
-                            end = buffer.index(ETX, start)
+                            idx = buffer.index(STX)
+                            buffer = buffer[idx:]
                         except ValueError:
-                            # Keep only data after last STX if found
-                            try:
-                                idx = buffer.index(STX)
-                                buffer = buffer[idx:]
-                            except ValueError:
-                                if len(buffer) > 1024:
-                                    buffer.clear()
-                            break
-
-                        # Extract message between STX and ETX
-                        msg = buffer[start+1:end]
-                        buffer = buffer[end+1:]
-
-                        # Parse messages: UR:, UN:, UG:, UM:, US:
-                        try:
-                            text = msg.decode('ascii', errors='ignore')
-                            if text.startswith('UR:'):
-                                # Trace event: UR:type,entity_id,data1,data2,timestamp
-                                parts = text[3:].split(',')
-                                if len(parts) >= 5:
-                                    evt_type = int(parts[0])
-                                    entity_id = int(parts[1])
-                                    data1 = int(parts[2])
-                                    data2 = int(parts[3])
-                                    timestamp = int(parts[4])
-                                    # Pack into bytes for compatibility
-                                    frame = struct.pack('<BHHIII',
-                                        evt_type, entity_id, 0,
-                                        data1, data2, timestamp)
-                                    self.data_received.emit(frame)
-                            elif text.startswith('UN:'):
-                                # Entity name: UN:id,name
-                                parts = text[3:].split(',', 1)
-                                if len(parts) >= 2:
-                                    entity_id = int(parts[0])
-                                    name = parts[1].strip()
-                                    self.entity_name_received.emit(entity_id, name)
-                            elif text.startswith('UG:'):
-                                # Signal name: UG:id,name
-                                parts = text[3:].split(',', 1)
-                                if len(parts) >= 2:
-                                    signal_id = int(parts[0])
-                                    name = parts[1].strip()
-                                    self.signal_name_received.emit(signal_id, name)
-                            elif text.startswith('US:'):
-                                # State name: US:entity_id,state_id,name
-                                parts = text[3:].split(',', 2)
-                                if len(parts) >= 3:
-                                    entity_id = int(parts[0])
-                                    state_id = int(parts[1])
-                                    name = parts[2].strip()
-                                    self.state_name_received.emit(entity_id, state_id, name)
-                            elif text.startswith('UM:'):
-                                # System info: UM:free_heap,min_heap
-                                parts = text[3:].split(',')
-                                if len(parts) >= 2:
-                                    free_heap = int(parts[0])
-                                    min_heap = int(parts[1])
-                                    self.sysinfo_received.emit(free_heap, min_heap)
-                        except (ValueError, IndexError):
-                            pass
-
-                else:
-                    time.sleep(0.01)
+                            if len(buffer) > 1024:
+                                buffer.clear()
+                        break
+
+                    # Extract message between STX and ETX
+                    msg = buffer[start+1:end]
+                    buffer = buffer[end+1:]
+
+                    # Parse messages: UR:, UN:, UG:, UM:, US:
+                    try:
+                        text = msg.decode('ascii', errors='ignore')
+                        if text.startswith('UR:'):
+                            # Trace event: UR:type,entity_id,data1,data2,timestamp
+                            parts = text[3:].split(',')
+                            if len(parts) >= 5:
+                                evt_type = int(parts[0])
+                                entity_id = int(parts[1])
+                                data1 = int(parts[2])
+                                data2 = int(parts[3])
+                                timestamp = int(parts[4])
+                                # Pack into bytes for compatibility
+                                frame = _TRACE_STRUCT.pack(
+                                    evt_type, entity_id, 0,
+                                    data1, data2, timestamp)
+                                frames.append(frame)
+                        elif text.startswith('UN:'):
+                            # Entity name: UN:id,name
+                            parts = text[3:].split(',', 1)
+                            if len(parts) >= 2:
+                                entity_id = int(parts[0])
+                                name = parts[1].strip()
+                                self.entity_name_received.emit(entity_id, name)
+                        elif text.startswith('UG:'):
+                            # Signal name: UG:id,name
+                            parts = text[3:].split(',', 1)
+                            if len(parts) >= 2:
+                                signal_id = int(parts[0])
+                                name = parts[1].strip()
+                                self.signal_name_received.emit(signal_id, name)
+                        elif text.startswith('US:'):
+                            # State name: US:entity_id,state_id,name
+                            parts = text[3:].split(',', 2)
+                            if len(parts) >= 3:
+                                entity_id = int(parts[0])
+                                state_id = int(parts[1])
+                                name = parts[2].strip()
+                                self.state_name_received.emit(entity_id, state_id, name)
+                        elif text.startswith('UM:'):
+                            # System info: UM:free_heap,min_heap
+                            parts = text[3:].split(',')
+                            if len(parts) >= 2:
+                                free_heap = int(parts[0])
+                                min_heap = int(parts[1])
+                                self.sysinfo_received.emit(free_heap, min_heap)
+                    except (ValueError, IndexError):
+                        pass
+
+                # Hand all trace frames from this read to the GUI in one signal
+                if frames:
+                    self.data_batch_received.emit(b''.join(frames))
 
             except Exception as e:
                 self.error_occurred.emit(str(e))
@@ -346,6 +386,7 @@ class GanttWidget(QWidget):
 
         self.events: List[TraceEvent] = []
         self.entity_colors: Dict[int, QColor] = {}
+        self.entity_pens: Dict[int, QPen] = {}  # block border pen per entity
         self.entity_names: Dict[int, str] = {}
         self.signal_names: Dict[int, str] = {}
         self.time_window_us = 100000  # 100ms
@@ -354,6 +395,10 @@ class GanttWidget(QWidget):
         self._hover_block = None
         self._dispatch_blocks: List[tuple] = []
         self._updating_scrollbar = False  # Flag to prevent recursion
+        # Completed dispatches per entity, paired at ingest so painting
+        # only touches spans inside the visible window
+        self._pending_start: Dict[int, tuple] = {}  # entity_id -> (start_us, signal_id)
+        self._spans: Dict[int, tuple] = {}  # entity_id -> (starts, ends, signal_ids)
 
         self.palette = [
             QColor(70, 130, 180), QColor(60, 179, 113), QColor(255, 165, 0),
@@ -412,6 +457,16 @@ class GanttWidget(QWidget):
         self._timer.timeout.connect(self._on_timer)
         self._timer.start(33)
 
+    def showEvent(self, e):
+        super().showEvent(e)
+        # Catch up on events received while hidden
+        self._dirty = True
+        self._timer.start(33)
+
+    def hideEvent(self, e):
+        super().hideEvent(e)
+        self._timer.stop()
+
     def _on_window_change(self, idx):
         vals = [10000, 50000, 100000, 200000, 500000, 1000000]
         self.time_window_us = vals[idx]
@@ -476,17 +531,36 @@ class GanttWidget(QWidget):
             # New timestamp is more than 1 second before last - device likely restarted
             self.events.clear()
             self.entity_colors.clear()
+            self.entity_pens.clear()
+            self._pending_start.clear()
+            self._spans.clear()
             self._dispatch_blocks.clear()
             self._scroll_offset = 0
 
         self.events.append(event)
-        if event.entity_id not in self.entity_colors:
-            self.entity_colors[event.entity_id] = self.palette[len(self.entity_colors) % len(self.palette)]
+        eid = event.entity_id
+        if eid not in self.entity_colors:
+            color = self.palette[len(self.entity_colors) % len(self.palette)]
+            self.entity_colors[eid] = color
+            self.entity_pens[eid] = QPen(color.darker(140), 1)
+
+        if event.event_type == TraceEvent.DISPATCH_START:
+            self._pending_start[eid] = (event.timestamp_us, event.signal_id)
+        elif event.event_type == TraceEvent.DISPATCH_END:
+            pending = self._pending_start.pop(eid, None)
+            if pending is not None:
+                starts, ends, sigs = self._spans.setdefault(eid, (array('q'), array('q'), []))
+                starts.append(pending[0])
+                ends.append(event.timestamp_us)
+                sigs.append(pending[1])
         self._dirty = True
 
     def clear(self):
         self.events.clear()
         self.entity_colors.clear()
+        self.entity_pens.clear()
+        self._pending_start.clear()
+        self._spans.clear()
         # Keep entity_names and signal_names (metadata)
         self._dispatch_blocks.clear()
         self._scroll_offset = 0
@@ -502,14 +576,72 @@ class GanttWidget(QWidget):
 class _GanttCanvas(QWidget):
     """Internal canvas for GanttWidget"""
 
+    # Paint constants, shared by every frame
+    BG = QColor(28, 28, 32)
+    EMPTY_FG = QColor(80, 80, 80)
+    GRID_PEN = QPen(QColor(45, 45, 50), 1)
+    TIME_FG = QColor(90, 90, 90)
+    LANE_A = QColor(38, 38, 42)
+    LANE_B = QColor(34, 34, 38)
+    LABEL_FG = QColor(160, 160, 160)
+    CURSOR_PEN = QPen(QColor(255, 100, 100), 2)
+    PANEL_BG = QColor(40, 40, 50, 240)
+    PANEL_PEN = QPen(QColor(255, 100, 100), 1)
+    PANEL_FG = QColor(220, 220, 220)
+    TOOLTIP_BG = QColor(55, 55, 65, 230)
+    TOOLTIP_FG = QColor(210, 210, 210)
+
     def __init__(self, parent: GanttWidget):
         super().__init__(parent)
         self.g = parent
+        # paintEvent fills the whole surface, so skip Qt's background erase
+        self.setAttribute(Qt.WA_NoSystemBackground, True)
+        self.setAttribute(Qt.WA_OpaquePaintEvent, True)
         self.setMouseTracking(True)
         self.setFocusPolicy(Qt.StrongFocus)  # Enable key events
         self._cursor_x = None  # Cursor x position (None = no cursor)
         self._cursor_time = None  # Time at cursor
         self._dragging = False
+        self._grid_key = None  # (dw, dh) the cached grid lines were built for
+        self._grid_lines: List[QLineF] = []
+        self._fm = QFontMetrics(self.font())
+
+    def changeEvent(self, e):
+        if e.type() == QEvent.FontChange:
+            self._fm = QFontMetrics(self.font())
+        super().changeEvent(e)
+
+    @staticmethod
+    def _span_geometry(starts, ends, lo, hi, min_t, max_t, left, dw, window):
+        """Clip spans [lo, hi) to the window and return (x1, width, duration) lists"""
+        if hi <= lo:
+            return [], [], []
+        if HAS_NUMPY:
+            st = np.frombuffer(starts[lo:hi], dtype=np.int64)
+            en = np.frombuffer(ends[lo:hi], dtype=np.int64)
+            dur = en - st
+            np.maximum(st, min_t, out=st)
+            np.minimum(en, max_t, out=en)
+            st -= min_t
+            en -= min_t
+            st *= dw
+            en *= dw
+            st //= window
+            en //= window
+            bw = en - st
+            np.maximum(bw, 3, out=bw)
+            st += left
+            return st.tolist(), bw.tolist(), dur.tolist()
+
+        x1s, bws, durs = [], [], []
+        for j in range(lo, hi):
+            st, end = starts[j], ends[j]
+            x1 = (max(st, min_t) - min_t) * dw // window
+            x2 = (min(end, max_t) - min_t) * dw // window
+            x1s.append(left + x1)
+            bws.append(max(3, x2 - x1))
+            durs.append(end - st)
+        return x1s, bws, durs
 
     def wheelEvent(self, e):
         delta = e.angleDelta().y()
@@ -571,13 +703,17 @@ class _GanttCanvas(QWidget):
     def paintEvent(self, e):
         g = self.g
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
         w, h = self.width(), self.height()
 
-        painter.fillRect(0, 0, w, h, QColor(28, 28, 32))
+        # Only the exposed region needs repainting (tooltips, overlapping widgets)
+        r = e.rect()
+        painter.setClipRect(r)
+        partial = not r.contains(self.rect())
+
+        painter.fillRect(0, 0, w, h, self.BG)
 
         if not g.events:
-            painter.setPen(QColor(80, 80, 80))
+            painter.setPen(self.EMPTY_FG)
             painter.drawText(w // 2 - 30, h // 2, "暂无数据")
             return
 
@@ -587,19 +723,22 @@ class _GanttCanvas(QWidget):
         left, bottom = 70, 18
         dw, dh = w - left - 5, h - bottom
 
-        # Grid
-        painter.setPen(QPen(QColor(45, 45, 50), 1))
-        for i in range(11):
-            x = left + dw * i // 10
-            painter.drawLine(x, 0, x, dh)
+        # Grid (rebuilt only on resize, drawn in one batch)
+        if self._grid_key != (dw, dh):
+            self._grid_key = (dw, dh)
+            self._grid_lines = [QLineF(left + dw * i // 10, 0, left + dw * i // 10, dh)
+                                for i in range(11)]
+        painter.setPen(self.GRID_PEN)
+        painter.drawLines(self._grid_lines)
 
         # Time labels
-        painter.setPen(QColor(90, 90, 90))
-        for i in range(0, 11, 2):
-            x = left + dw * i // 10
-            t = min_t + g.time_window_us * i // 10
-            lbl = f"{t/1e6:.1f}s" if g.time_window_us >= 1000000 else f"{t/1000:.0f}ms"
-            painter.drawText(x - 12, h - 2, lbl)
+        if r.bottom() >= dh:
+            painter.setPen(self.TIME_FG)
+            for i in range(0, 11, 2):
+                x = left + dw * i // 10
+                t = min_t + g.time_window_us * i // 10
+                lbl = f"{t/1e6:.1f}s" if g.time_window_us >= 1000000 else f"{t/1000:.0f}ms"
+                painter.drawText(x - 12, h - 2, lbl)
 
         # Lanes
         ents = sorted(g.entity_colors.keys())
@@ -607,50 +746,55 @@ class _GanttCanvas(QWidget):
             return
 
         lane_h = min(40, max(24, (dh - 5) // len(ents)))
-        g._dispatch_blocks.clear()
+        old_blocks = g._dispatch_blocks
+        g._dispatch_blocks = []
 
         for i, eid in enumerate(ents):
             y = i * lane_h + 3
             if y + lane_h > dh:
                 break
 
-            painter.fillRect(left, y, dw, lane_h - 2, QColor(38, 38, 42) if i % 2 else QColor(34, 34, 38))
+            # Lane outside the exposed region: keep its blocks for hit-testing
+            if partial and (y > r.bottom() or y + lane_h < r.top()):
+                g._dispatch_blocks.extend(b for b in old_blocks if b[4] == eid)
+                continue
+
+            painter.fillRect(left, y, dw, lane_h - 2, self.LANE_A if i % 2 else self.LANE_B)
 
             name = g.entity_names.get(eid, f"E{eid}")
-            painter.setPen(QColor(160, 160, 160))
+            painter.setPen(self.LABEL_FG)
             painter.drawText(3, y + lane_h // 2 + 5, name[:8])
 
+            spans = g._spans.get(eid)
+            if not spans:
+                continue
+            starts, ends, sigs = spans
             color = g.entity_colors[eid]
-            st, sig = None, 0
+            border_pen = g.entity_pens[eid]
+            by, bh = y + 3, lane_h - 6
 
-            for ev in g.events:
-                if ev.entity_id != eid:
-                    continue
-                if ev.event_type == TraceEvent.DISPATCH_START:
-                    st, sig = ev.timestamp_us, ev.signal_id
-                elif ev.event_type == TraceEvent.DISPATCH_END and st is not None:
-                    if ev.timestamp_us >= min_t and st <= max_t:
-                        x1 = left + int((max(st, min_t) - min_t) * dw / g.time_window_us)
-                        x2 = left + int((min(ev.timestamp_us, max_t) - min_t) * dw / g.time_window_us)
-                        bw = max(3, x2 - x1)
-                        by, bh = y + 3, lane_h - 6
-
-                        painter.fillRect(x1, by, bw, bh, color)
-                        painter.setPen(QPen(color.darker(140), 1))
-                        painter.drawRect(x1, by, bw, bh)
-
-                        dur = ev.timestamp_us - st
-                        g._dispatch_blocks.append((x1, by, x1 + bw, by + bh, eid, dur, sig, st, ev.timestamp_us))
-
-                        if bw > 32:
-                            painter.setPen(Qt.white)
-                            painter.drawText(x1 + 2, by + bh - 2, f"{dur}μs")
-                    st = None
+            # Spans are in time order: only [lo, hi) overlaps the window
+            lo = bisect_left(ends, min_t)
+            hi = max(lo, bisect_right(starts, max_t))
+            x1s, bws, durs = self._span_geometry(starts, ends, lo, hi, min_t, max_t,
+                                                 left, dw, g.time_window_us)
+
+            for j, x1, bw, dur in zip(range(lo, hi), x1s, bws, durs):
+                painter.fillRect(x1, by, bw, bh, color)
+                painter.setPen(border_pen)
+                painter.drawRect(x1, by, bw, bh)
+
+                g._dispatch_blocks.append((x1, by, x1 + bw, by + bh, eid, dur, sigs[j],
+                                           starts[j], ends[j]))
+
+                if bw > 32:
+                    painter.setPen(Qt.white)
+                    painter.drawText(x1 + 2, by + bh - 2, f"{dur}μs")
 
         # Draw cursor line and info panel
         if self._cursor_x is not None and self._cursor_time is not None:
             # Draw cursor line
-            painter.setPen(QPen(QColor(255, 100, 100), 2))
+            painter.setPen(self.CURSOR_PEN)
             painter.drawLine(self._cursor_x, 0, self._cursor_x, dh)
 
             # Find events at cursor time
@@ -672,15 +816,15 @@ class _GanttCanvas(QWidget):
             if not cursor_info:
                 panel_lines.append("(无活动)")
 
-            panel_w = max(len(l) for l in panel_lines) * 8 + 12
+            panel_w = max(self._fm.horizontalAdvance(l) for l in panel_lines) + 12
             panel_h = len(panel_lines) * 16 + 8
             px = min(self._cursor_x + 10, w - panel_w - 5)
             py = 5
 
-            painter.fillRect(px, py, panel_w, panel_h, QColor(40, 40, 50, 240))
-            painter.setPen(QPen(QColor(255, 100, 100), 1))
+            painter.fillRect(px, py, panel_w, panel_h, self.PANEL_BG)
+            painter.setPen(self.PANEL_PEN)
             painter.drawRect(px, py, panel_w, panel_h)
-            painter.setPen(QColor(220, 220, 220))
+            painter.setPen(self.PANEL_FG)
             for i, line in enumerate(panel_lines):
                 painter.drawText(px + 6, py + 14 + i * 16, line)
 
@@ -690,10 +834,10 @@ class _GanttCanvas(QWidget):
             name = g.entity_names.get(eid, f"E{eid}")
             sig_name = g.signal_names.get(sig, f"0x{sig:04X}")
             txt = f"{name} | {sig_name} | {dur}μs"
-            tw = len(txt) * 7 + 8
+            tw = self._fm.horizontalAdvance(txt) + 8
             tx, ty = min(x2 + 5, w - tw - 3), max(y1 - 18, 3)
-            painter.fillRect(tx, ty, tw, 16, QColor(55, 55, 65, 230))
-            painter.setPen(QColor(210, 210, 210))
+            painter.fillRect(tx, ty, tw, 16, self.TOOLTIP_BG)
+            painter.setPen(self.TOOLTIP_FG)
             painter.drawText(tx + 4, ty + 12, txt)
 
         # Info
@@ -709,9 +853,13 @@ class SignalFlowWidget(QWidget):
 
         self.signals: List[SignalRecord] = []
         self.entity_positions: Dict[int, int] = {}
+        self._positions_version = 0  # bumped whenever entity_positions changes
         self.entity_names: Dict[int, str] = {}
         self.signal_names: Dict[int, str] = {}
         self.hidden_signals: set = set()  # Signal IDs to hide
+        self._known_signals: Dict[int, str] = {}  # every signal seen or registered
+        self._filtered_signals: List[SignalRecord] = []  # signals minus hidden ones
+        self._filter_dirty = False
         self._dirty = False
         self._paused = False
         self._scroll_offset = 0
@@ -788,6 +936,16 @@ class SignalFlowWidget(QWidget):
         self._refresh_timer.timeout.connect(self._do_refresh)
         self._refresh_timer.start(50)
 
+    def showEvent(self, e):
+        super().showEvent(e)
+        # Catch up on signals received while hidden
+        self._dirty = True
+        self._refresh_timer.start(50)
+
+    def hideEvent(self, e):
+        super().hideEvent(e)
+        self._refresh_timer.stop()
+
     def _on_count_change(self, idx):
         vals = [10, 20, 30, 50]
         self._visible_count = vals[idx]
@@ -815,8 +973,7 @@ class SignalFlowWidget(QWidget):
 
     def _update_scrollbar(self):
         self._updating_scrollbar = True
-        filtered = [s for s in self.signals if s.signal_id not in self.hidden_signals]
-        total = len(filtered)
+        total = len(self.filtered_signals())
         max_val = max(0, total - self._visible_count)
         self.scrollbar.setMaximum(max_val)
         self.scrollbar.setPageStep(self._visible_count)
@@ -829,7 +986,7 @@ class SignalFlowWidget(QWidget):
             self._dirty = False
             self._update_scrollbar()
             self._canvas.update()
-        filtered_count = len([s for s in self.signals if s.signal_id not in self.hidden_signals])
+        filtered_count = len(self.filtered_signals())
         hidden_count = len(self.signals) - filtered_count
         if hidden_count > 0:
             self.info_label.setText(f"信号:{filtered_count} (隐藏:{hidden_count})")
@@ -842,17 +999,7 @@ class SignalFlowWidget(QWidget):
         menu.setStyleSheet("QMenu { background-color: #3a3a40; color: white; }"
                           "QMenu::item:selected { background-color: #5a5a60; }")
 
-        # Collect all known signal IDs from records
-        known_signals = {}
-        for sig in self.signals:
-            if sig.signal_id not in known_signals:
-                known_signals[sig.signal_id] = sig.signal_name
-
-        # Add signal names from registry
-        for sig_id, name in self.signal_names.items():
-            if sig_id not in known_signals:
-                known_signals[sig_id] = name
-
+        known_signals = self._known_signals
         if not known_signals:
             action = menu.addAction("(暂无信号)")
             action.setEnabled(False)
@@ -863,57 +1010,85 @@ class SignalFlowWidget(QWidget):
                 action.setCheckable(True)
                 action.setChecked(sig_id not in self.hidden_signals)
                 action.setData(sig_id)
-                action.triggered.connect(lambda checked, sid=sig_id: self._toggle_signal(sid, checked))
+                action.triggered.connect(self._on_filter_action_triggered)
 
         menu.addSeparator()
         show_all = menu.addAction("显示全部")
         show_all.triggered.connect(self._show_all_signals)
         hide_all = menu.addAction("隐藏全部")
-        hide_all.triggered.connect(lambda: self._hide_all_signals(known_signals.keys()))
+        hide_all.triggered.connect(self._on_hide_all_triggered)
 
         menu.exec(self.filter_btn.mapToGlobal(QPoint(0, self.filter_btn.height())))
 
+    def _on_filter_action_triggered(self, checked: bool):
+        """Shared slot for the per-signal filter actions"""
+        self._toggle_signal(self.sender().data(), checked)
+
+    def _on_hide_all_triggered(self):
+        self._hide_all_signals(self._known_signals.keys())
+
     def _toggle_signal(self, signal_id: int, show: bool):
         """Toggle signal visibility"""
         if show:
             self.hidden_signals.discard(signal_id)
         else:
             self.hidden_signals.add(signal_id)
+        self._filter_dirty = True
         self._canvas.update()
 
     def _show_all_signals(self):
         """Show all signals"""
         self.hidden_signals.clear()
+        self._filter_dirty = True
         self._canvas.update()
 
     def _hide_all_signals(self, signal_ids):
         """Hide all signals"""
         self.hidden_signals = set(signal_ids)
+        self._filter_dirty = True
         self._canvas.update()
 
+    def filtered_signals(self) -> List[SignalRecord]:
+        """Signals not hidden by the filter, rebuilt only when the filter changes"""
+        if self._filter_dirty:
+            self._filter_dirty = False
+            hidden = self.hidden_signals
+            self._filtered_signals = [s for s in self.signals if s.signal_id not in hidden]
+        return self._filtered_signals
+
     def register_entity_name(self, eid: int, name: str):
         self.entity_names[eid] = name
 
     def register_signal_name(self, sig_id: int, name: str):
         self.signal_names[sig_id] = name
+        self._known_signals[sig_id] = name
 
     def add_signal(self, record: SignalRecord):
         if self._paused:
             return
 
         self.signals.append(record)
+        self._known_signals.setdefault(record.signal_id, record.signal_name)
+        if record.signal_id not in self.hidden_signals:
+            self._filtered_signals.append(record)
 
         # Track entity positions
         if record.src_id not in self.entity_positions:
             self.entity_positions[record.src_id] = len(self.entity_positions)
+            self._positions_version += 1
         if record.dst_id not in self.entity_positions:
             self.entity_positions[record.dst_id] = len(self.entity_positions)
+            self._positions_version += 1
 
         self._dirty = True
 
     def clear(self):
         self.signals.clear()
+        self._known_signals = dict(self.signal_names)
+        self._filtered_signals.clear()
+        self._filter_dirty = False
         self.entity_positions.clear()
+        self._positions_version += 1
         self.hidden_signals.clear()
         self._scroll_offset = 0
         self._update_scrollbar()
@@ -926,11 +1101,17 @@ class _SignalFlowCanvas(QWidget):
     def __init__(self, parent: 'SignalFlowWidget'):
         super().__init__(parent)
         self.g = parent
+        # paintEvent fills the whole surface, so skip Qt's background erase
+        self.setAttribute(Qt.WA_NoSystemBackground, True)
+        self.setAttribute(Qt.WA_OpaquePaintEvent, True)
+        self._font = QFont("Consolas", 9, QFont.Bold)
+        self._fm = QFontMetrics(self._font)
+        self._col_key = None  # (positions_version, col_width) of _col_x
+        self._col_x: Dict[int, int] = {}  # entity_id -> column x
 
     def paintEvent(self, event):
         g = self.g
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
 
         width = self.width()
         height = self.height()
@@ -944,7 +1125,7 @@ class _SignalFlowCanvas(QWidget):
             return
 
         # Calculate visible signals (excluding hidden ones)
-        filtered_signals = [s for s in g.signals if s.signal_id not in g.hidden_signals]
+        filtered_signals = g.filtered_signals()
         total = len(filtered_signals)
         start_idx = max(0, total - g._visible_count - g._scroll_offset)
         end_idx = min(total, start_idx + g._visible_count)
@@ -958,17 +1139,20 @@ class _SignalFlowCanvas(QWidget):
         # Draw entity columns
         num_entities = len(g.entity_positions)
         col_width = width // (num_entities + 1)
+        if self._col_key != (g._positions_version, col_width):
+            self._col_key = (g._positions_version, col_width)
+            self._col_x = {eid: (idx + 1) * col_width for eid, idx in g.entity_positions.items()}
+        col_x = self._col_x
 
         painter.setPen(QPen(QColor(80, 80, 90), 1))
-        font = QFont("Consolas", 9, QFont.Bold)
-        painter.setFont(font)
+        painter.setFont(self._font)
+        fm = self._fm
 
-        for entity_id, idx in g.entity_positions.items():
-            x = (idx + 1) * col_width
+        for entity_id, x in col_x.items():
             painter.drawLine(x, 40, x, height - 5)
             name = g.entity_names.get(entity_id, f"E{entity_id}")
             painter.setPen(QColor(180, 180, 180))
-            painter.drawText(x - len(name) * 3, 25, name)
+            painter.drawText(x - fm.horizontalAdvance(name) // 2, 25, name)
             painter.setPen(QPen(QColor(80, 80, 90), 1))
 
         # Draw signal arrows
@@ -977,28 +1161,30 @@ class _SignalFlowCanvas(QWidget):
         for i, sig in enumerate(visible_signals):
             y = 50 + i * row_height
 
-            src_x = (g.entity_positions.get(sig.src_id, 0) + 1) * col_width
-            dst_x = (g.entity_positions.get(sig.dst_id, 0) + 1) * col_width
+            src_x = col_x.get(sig.src_id, col_width)
+            dst_x = col_x.get(sig.dst_id, col_width)
 
             # Arrow line
             color = QColor(70, 150, 200)
             painter.setPen(QPen(color, 2))
             painter.drawLine(src_x, y, dst_x, y)
 
-            # Arrow head
+            # Arrow head (only the diagonal strokes need antialiasing)
             direction = 1 if dst_x > src_x else -1
+            painter.setRenderHint(QPainter.Antialiasing, True)
             if src_x != dst_x:
                 painter.drawLine(dst_x, y, dst_x - direction * 8, y - 4)
                 painter.drawLine(dst_x, y, dst_x - direction * 8, y + 4)
             else:
                 # Self signal - draw loop
                 painter.drawArc(dst_x - 15, y - 10, 30, 20, 0, 180 * 16)
+            painter.setRenderHint(QPainter.Antialiasing, False)
 
             # Label
             mid_x = (src_x + dst_x) // 2
             painter.setPen(QColor(220, 220, 220))
             label = sig.signal_name[:20]
-            painter.drawText(mid_x - len(label) * 3, y - 4, label)
+            painter.drawText(mid_x - fm.horizontalAdvance(label) // 2, y - 4, label)
 
 
 class StatsWidget(QWidget):
@@ -1057,6 +1243,21 @@ class StatsWidget(QWidget):
         self.entity_bars[entity_id].setValue(load_percent)
 
 
+def _m4_downsample(x, y, n_px: int):
+    """M4 aggregation: keep the first, min, max and last sample of each pixel column"""
+    n = len(y)
+    edges = np.unique(np.linspace(0, n, n_px + 1).astype(np.intp))
+    starts = edges[:-1]
+    counts = np.diff(edges)
+    # Sort by (bin, value): each bin's first entry is its min, last is its max
+    bins = np.repeat(np.arange(len(starts)), counts)
+    order = np.lexsort((y, bins))
+    mins = order[starts]
+    maxs = order[edges[1:] - 1]
+    idx = np.sort(np.stack((starts, mins, maxs, edges[1:] - 1), axis=1), axis=1).ravel()
+    return x[idx], y[idx]
+
+
 # =============================================================================
 # Main Window
 # =============================================================================
@@ -1071,19 +1272,45 @@ class ReactorScope(QMainWindow):
 
         # Data
         self.serial_worker = SerialWorker()
-        self.signal_records: List[SignalRecord] = []
-        self.trace_events: List[TraceEvent] = []
+        # Bounded history so long live captures keep a flat memory footprint
+        self.signal_records: Deque[SignalRecord] = deque(maxlen=50000)
+        self.trace_events: Deque[TraceEvent] = deque(maxlen=50000)
         self.entity_status: Dict[int, EntityStatus] = {}
         self.entity_names: Dict[int, str] = {}   # entity_id -> name
         self.signal_names: Dict[int, str] = {}   # signal_id -> name
         self.state_names: Dict[tuple, str] = {}  # (entity_id, state_id) -> name
+        self._pending_dispatch: Dict[int, int] = {}  # entity_id -> DISPATCH_START timestamp
+        self._tree_items: Dict[int, QTreeWidgetItem] = {}  # entity_id -> entity tree row
         self.free_heap: int = 0
         self.min_heap: int = 0
 
         # Statistics
         self.total_signals = 0
-        self.signal_times: Deque[float] = deque(maxlen=100)
-        self.dispatch_times: Deque[int] = deque(maxlen=100)
+        # Per-second signal counts as [second, count]
+        self._rate_bins: Deque[List[int]] = deque(maxlen=5)
+        # Dispatch plot samples, the same 100-sample window as dispatch_times.
+        # Each value is written at i and i + cap so the latest samples are
+        # always one contiguous slice for setData.
+        self._plot_cap = 100
+        self.dispatch_times: Deque[int] = deque(maxlen=self._plot_cap)
+        if HAS_PYQTGRAPH:
+            self._dispatch_buf = np.zeros(2 * self._plot_cap, dtype=np.float64)
+            self._dispatch_x = np.arange(self._plot_cap, dtype=np.float64)
+        self._dispatch_head = 0
+        self._dispatch_len = 0
+        self._plot_dirty = False
+
+        # Raw trace frames and their receive times, decoded in batches
+        self._raw_buf = bytearray()
+        self._raw_times = array('d')
+
+        # Staged for the widgets, flushed by the 10 Hz update timer
+        self._pending_events: Deque[TraceEvent] = deque()
+        # Flow and log backlogs are only drained while their tab is showing,
+        # so cap them at what those views would keep anyway
+        self._pending_signals: Deque[SignalRecord] = deque(maxlen=50000)
+        # (received, src, dst, signal), formatted at flush
+        self._pending_log_lines: Deque[tuple] = deque(maxlen=5000)
 
         self._create_actions()
         self._create_menus()
@@ -1092,7 +1319,7 @@ class ReactorScope(QMainWindow):
         self._create_statusbar()
 
         # Connect signals
-        self.serial_worker.data_received.connect(self._on_data_received)
+        self.serial_worker.data_batch_received.connect(self._on_data_batch)
         self.serial_worker.connection_changed.connect(self._on_connection_changed)
         self.serial_worker.error_occurred.connect(self._on_error)
         self.serial_worker.entity_name_received.connect(self._on_entity_name)
@@ -1223,6 +1450,7 @@ class ReactorScope(QMainWindow):
 
         # Center - Tab widget with visualizations
         center_tabs = QTabWidget()
+        self.center_tabs = center_tabs
 
         # Gantt tab
         self.gantt_widget = GanttWidget()
@@ -1238,13 +1466,16 @@ class ReactorScope(QMainWindow):
             self.plot_widget.setBackground('w')
             self.plot_widget.setLabel('left', 'Dispatch Time', 'μs')
             self.plot_widget.setLabel('bottom', 'Time', 's')
-            self.plot_curve = self.plot_widget.plot(pen=pg.mkPen('b', width=2))
+            # Wide pens are slow on the OpenGL path; keep them only without it
+            self.plot_curve = self.plot_widget.plot(pen=pg.mkPen('b', width=1 if HAS_OPENGL else 2))
             center_tabs.addTab(self.plot_widget, tr("tab_plot"))
 
         # Log tab
-        self.log_text = QTextEdit()
+        self.log_text = QPlainTextEdit()
         self.log_text.setReadOnly(True)
-        self.log_text.setFontFamily("Consolas")
+        self.log_text.setFont(QFont("Consolas"))
+        self.log_text.setUndoRedoEnabled(False)
+        self.log_text.setMaximumBlockCount(5000)  # oldest lines are dropped
         center_tabs.addTab(self.log_text, tr("tab_log"))
 
         main_splitter.addWidget(center_tabs)
@@ -1295,7 +1526,7 @@ class ReactorScope(QMainWindow):
             self.status_label.setStyleSheet("color: red;")
 
     def _on_error(self, error: str):
-        self.log_text.append(f"{tr('msg_error')} {error}")
+        self._append_log(f"{tr('msg_error')} {error}")
 
     def _on_entity_name(self, entity_id: int, name: str):
         """Handle entity name from device"""
@@ -1305,14 +1536,14 @@ class ReactorScope(QMainWindow):
         # Update entity status if exists
         if entity_id in self.entity_status:
             self.entity_status[entity_id].name = name
-        self.log_text.append(f"[META] 实体 {entity_id} = {name}")
+        self._append_log(f"[META] 实体 {entity_id} = {name}")
 
     def _on_signal_name(self, signal_id: int, name: str):
         """Handle signal name from device"""
         self.signal_names[signal_id] = name
         self.gantt_widget.register_signal_name(signal_id, name)
         self.flow_widget.register_signal_name(signal_id, name)
-        self.log_text.append(f"[META] 信号 0x{signal_id:04X} = {name}")
+        self._append_log(f"[META] 信号 0x{signal_id:04X} = {name}")
 
     def _on_sysinfo(self, free_heap: int, min_heap: int):
         """Handle system info from device"""
@@ -1323,132 +1554,180 @@ class ReactorScope(QMainWindow):
         """Handle state name from device"""
         self.state_names[(entity_id, state_id)] = name
         ent_name = self.entity_names.get(entity_id, f"E{entity_id}")
-        self.log_text.append(f"[META] 状态 {ent_name}:{state_id} = {name}")
+        self._append_log(f"[META] 状态 {ent_name}:{state_id} = {name}")
 
-    def _on_data_received(self, data: bytes):
+    def _on_data_batch(self, batch: bytes):
         if self.pause_action.isChecked():
             return
 
-        # Parse trace event (new format from text protocol)
+        # Only stash the raw frames here; they are decoded on the next stats tick
+        n = len(batch) // _TRACE_STRUCT.size
+        if n:
+            self._raw_buf += memoryview(batch)[:n * _TRACE_STRUCT.size]
+            self._raw_times.extend([time.time()] * n)
+
+    def _ingest_raw(self):
+        """Decode all trace frames received since the last tick"""
+        if not self._raw_buf:
+            return
+        raw, times = self._raw_buf, self._raw_times
+        self._raw_buf = bytearray()
+        self._raw_times = array('d')
         # Format: event_type(B), entity_id(H), pad(H), data1(I), data2(I), timestamp(I)
-        if len(data) >= 17:
-            try:
-                event_type, entity_id, _, data1, data2, timestamp = struct.unpack('<BHHIII', data[:17])
-
-                # Interpret data based on event type
-                signal_id = data1 & 0xFFFF if event_type in [0, 1, 3, 4] else 0
-                src_id = data2 & 0xFFFF if event_type in [0, 1, 3, 4] else 0
-                from_state = data1 & 0xFFFF if event_type == 2 else 0
-                to_state = data2 & 0xFFFF if event_type == 2 else 0
-
-                event = TraceEvent(
-                    timestamp_us=timestamp,
-                    entity_id=entity_id,
-                    event_type=event_type,
-                    signal_id=signal_id,
-                    src_id=src_id,
-                    from_state=from_state,
-                    to_state=to_state
-                )
-
-                self.trace_events.append(event)
-                self.gantt_widget.add_event(event)
-
-                # Track entity status
-                if entity_id not in self.entity_status:
-                    self.entity_status[entity_id] = EntityStatus(
-                        id=entity_id, name=f"E{entity_id}", state=0,
-                        state_name="--", inbox_count=0, signal_count=0,
-                        last_signal="--", last_dispatch_us=0
-                    )
-
-                # Update entity state on state change
-                if event_type == TraceEvent.STATE_CHANGE:
-                    self.entity_status[entity_id].state = to_state
-                    # Use state name if available
-                    state_name = self.state_names.get((entity_id, to_state), f"S{to_state}")
-                    self.entity_status[entity_id].state_name = state_name
-
-                # Track dispatch times
-                if event.event_type == TraceEvent.DISPATCH_END:
-                    # Find matching start
-                    for e in reversed(self.trace_events):
-                        if (e.entity_id == event.entity_id and
-                            e.event_type == TraceEvent.DISPATCH_START):
-                            duration = event.timestamp_us - e.timestamp_us
-                            self.dispatch_times.append(duration)
-                            self.entity_status[entity_id].last_dispatch_us = duration
-                            break
-
-                # Track signals
-                if event_type == TraceEvent.DISPATCH_START:
-                    self.entity_status[entity_id].signal_count += 1
-                    sig_name = self.signal_names.get(signal_id, f"0x{signal_id:04X}")
-                    self.entity_status[entity_id].last_signal = sig_name
-
-                    # Add to signal flow (use dispatch as signal flow)
-                    self.total_signals += 1
-                    self.signal_times.append(time.time())
-
-                    src_name = self.entity_names.get(src_id, f"E{src_id}") if src_id else "?"
-                    dst_name = self.entity_names.get(entity_id, f"E{entity_id}")
-
-                    record = SignalRecord(
-                        timestamp=time.time(),
-                        src_id=src_id,
-                        src_name=src_name,
-                        dst_id=entity_id,
-                        dst_name=dst_name,
-                        signal_id=signal_id,
-                        signal_name=sig_name,
-                        payload=b''
-                    )
-                    self.signal_records.append(record)
-                    self.flow_widget.add_signal(record)
-
-                    # Log
-                    self.log_text.append(
-                        f"[{datetime.now().strftime('%H:%M:%S.%f')[:-3]}] "
-                        f"{src_name} -> {dst_name}: {sig_name}"
-                    )
-
-                # Log signals (legacy SIGNAL_EMIT/RECV - keep for compatibility)
-                elif event.event_type in [TraceEvent.SIGNAL_EMIT, TraceEvent.SIGNAL_RECV]:
-                    self.total_signals += 1
-                    self.signal_times.append(time.time())
-
-                    # Use names if available
-                    src_name = self.entity_names.get(event.src_id, f"E{event.src_id}")
-                    dst_name = self.entity_names.get(event.entity_id, f"E{event.entity_id}")
-                    sig_name = self.signal_names.get(event.signal_id, f"0x{event.signal_id:04X}")
-
-                    record = SignalRecord(
-                        timestamp=time.time(),
-                        src_id=event.src_id,
-                        src_name=src_name,
-                        dst_id=event.entity_id,
-                        dst_name=dst_name,
-                        signal_id=event.signal_id,
-                        signal_name=sig_name,
-                        payload=b''
-                    )
-                    self.signal_records.append(record)
-                    self.flow_widget.add_signal(record)
-
-                    # Log
-                    self.log_text.append(
-                        f"[{datetime.now().strftime('%H:%M:%S.%f')[:-3]}] "
-                        f"{src_name} -> {dst_name}: {sig_name}"
-                    )
+        for received, (event_type, entity_id, _, data1, data2, timestamp) in zip(
+                times, _TRACE_STRUCT.iter_unpack(raw)):
+            self._process_trace(received, event_type, entity_id, data1, data2, timestamp)
+
+    def _process_trace(self, received: float, event_type: int, entity_id: int,
+                       data1: int, data2: int, timestamp: int):
+        # Interpret data based on event type
+        has_signal = event_type in _SIGNAL_ID_EVENT_TYPES
+        signal_id = data1 & 0xFFFF if has_signal else 0
+        src_id = data2 & 0xFFFF if has_signal else 0
+        from_state = data1 & 0xFFFF if event_type == 2 else 0
+        to_state = data2 & 0xFFFF if event_type == 2 else 0
+
+        event = TraceEvent(
+            timestamp_us=timestamp,
+            entity_id=entity_id,
+            event_type=event_type,
+            signal_id=signal_id,
+            src_id=src_id,
+            from_state=from_state,
+            to_state=to_state
+        )
 
-            except Exception as e:
-                pass
+        self.trace_events.append(event)
+        self._pending_events.append(event)
+
+        # Track entity status
+        status = self.entity_status.get(entity_id)
+        if status is None:
+            status = self.entity_status[entity_id] = EntityStatus(
+                id=entity_id, name=f"E{entity_id}", state=0,
+                state_name="--", inbox_count=0, signal_count=0,
+                last_signal="--", last_dispatch_us=0
+            )
+
+        # Update entity state on state change
+        if event_type == TraceEvent.STATE_CHANGE:
+            status.state = to_state
+            # Use state name if available
+            status.state_name = self.state_names.get((entity_id, to_state), f"S{to_state}")
+
+        # Track dispatch times
+        if event_type == TraceEvent.DISPATCH_END:
+            start_ts = self._pending_dispatch.pop(entity_id, None)
+            if start_ts is not None:
+                duration = timestamp - start_ts
+                self.dispatch_times.append(duration)
+                if HAS_PYQTGRAPH:
+                    self._push_dispatch_sample(duration)
+                status.last_dispatch_us = duration
+
+        # Track signals
+        if event_type == TraceEvent.DISPATCH_START:
+            self._pending_dispatch[entity_id] = timestamp
+            status.signal_count += 1
+            sig_name = self.signal_names.get(signal_id, f"0x{signal_id:04X}")
+            status.last_signal = sig_name
+
+            # Add to signal flow (use dispatch as signal flow)
+            src_name = self.entity_names.get(src_id, f"E{src_id}") if src_id else "?"
+            self._record_signal(received, src_id, src_name, entity_id, signal_id, sig_name)
+
+        # Log signals (legacy SIGNAL_EMIT/RECV - keep for compatibility)
+        elif event_type in _SIGNAL_EVENT_TYPES:
+            src_name = self.entity_names.get(src_id, f"E{src_id}")
+            sig_name = self.signal_names.get(signal_id, f"0x{signal_id:04X}")
+            self._record_signal(received, src_id, src_name, entity_id, signal_id, sig_name)
+
+    def _record_signal(self, received: float, src_id: int, src_name: str,
+                       dst_id: int, signal_id: int, sig_name: str):
+        """Count a signal and stage it for the flow view and log"""
+        self.total_signals += 1
+        sec = int(received)
+        bins = self._rate_bins
+        if not bins or bins[-1][0] != sec:
+            bins.append([sec, 0])
+        bins[-1][1] += 1
+
+        dst_name = self.entity_names.get(dst_id, f"E{dst_id}")
+        record = SignalRecord(
+            timestamp=received,
+            src_id=src_id,
+            src_name=src_name,
+            dst_id=dst_id,
+            dst_name=dst_name,
+            signal_id=signal_id,
+            signal_name=sig_name,
+            payload=b''
+        )
+        self.signal_records.append(record)
+        self._pending_signals.append(record)
+        self._pending_log_lines.append((received, src_name, dst_name, sig_name))
+
+    def _push_dispatch_sample(self, duration: int):
+        cap = self._plot_cap
+        head = self._dispatch_head
+        self._dispatch_buf[head] = self._dispatch_buf[head + cap] = duration
+        self._dispatch_head = (head + 1) % cap
+        if self._dispatch_len < cap:
+            self._dispatch_len += 1
+        self._plot_dirty = True
+
+    def _flush_pending(self):
+        """Hand everything received since the last tick to the widgets in one batch"""
+        self._ingest_raw()
+
+        pending = self._pending_events
+        while pending:
+            self.gantt_widget.add_event(pending.popleft())
+
+        # Flow and log views are only fed while visible; their backlog waits
+        current = self.center_tabs.currentWidget()
+        if current is self.flow_widget:
+            pending = self._pending_signals
+            while pending:
+                self.flow_widget.add_signal(pending.popleft())
+
+        if current is self.log_text:
+            self._drain_log()
+
+    def _drain_log(self):
+        """Write the held-back signal lines to the log in one append"""
+        if not self._pending_log_lines:
+            return
+        lines = []
+        for received, src_name, dst_name, sig_name in self._pending_log_lines:
+            t = time.localtime(received)
+            ms = int(received * 1000) % 1000
+            lines.append(f"[{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}.{ms:03d}] "
+                         f"{src_name} -> {dst_name}: {sig_name}")
+        self.log_text.setUpdatesEnabled(False)
+        try:
+            self.log_text.appendPlainText("\n".join(lines))
+        finally:
+            self.log_text.setUpdatesEnabled(True)
+        self._pending_log_lines.clear()
+
+    def _append_log(self, text: str):
+        """Append one line after any held-back lines, keeping the log in order"""
+        self._ingest_raw()  # frames received before this line come first
+        self._drain_log()
+        self.log_text.appendPlainText(text)
 
     def _update_stats(self):
-        # Calculate signal rate
-        now = time.time()
-        recent = [t for t in self.signal_times if now - t < 1.0]
-        rate = len(recent)
+        self._flush_pending()
+
+        # Calculate signal rate from the last complete second's bucket
+        prev_sec = int(time.time()) - 1
+        rate = 0
+        for sec, count in reversed(self._rate_bins):
+            if sec <= prev_sec:
+                if sec == prev_sec:
+                    rate = count
+                break
         self.rate_label.setText(f"{rate} sig/s")
 
         # Update stats widget (using internal keys)
@@ -1462,33 +1741,43 @@ class ReactorScope(QMainWindow):
             self.stats_widget.update_stat("memory", mem_str)
 
         if self.dispatch_times:
-            max_dispatch = max(self.dispatch_times)
-            avg_dispatch = sum(self.dispatch_times) // len(self.dispatch_times)
+            if HAS_NUMPY:
+                dt = np.fromiter(self.dispatch_times, dtype=np.int64, count=len(self.dispatch_times))
+                max_dispatch = int(dt.max())
+                avg_dispatch = int(dt.sum()) // len(dt)
+            else:
+                max_dispatch = max(self.dispatch_times)
+                avg_dispatch = sum(self.dispatch_times) // len(self.dispatch_times)
             self.stats_widget.update_stat("max", str(max_dispatch))
             self.stats_widget.update_stat("avg", str(avg_dispatch))
 
-        # Update entity tree (use entity names if available)
-        for eid, status in self.entity_status.items():
-            name = self.entity_names.get(eid, f"E{eid}")
-            items = self.entity_tree.findItems(name, Qt.MatchExactly, 0)
-            # Also try old name format
-            if not items:
-                items = self.entity_tree.findItems(f"E{eid}", Qt.MatchExactly, 0)
-            if items:
-                item = items[0]
-                item.setText(0, name)  # Update name in case it changed
-                item.setText(1, status.state_name)
-                item.setText(2, str(status.signal_count))
-            else:
-                item = QTreeWidgetItem([name, status.state_name, str(status.signal_count)])
-                self.entity_tree.addTopLevelItem(item)
-                self.entity_tree.addTopLevelItem(item)
+        # Update entity tree (use entity names if available); repaint once at the end
+        self.entity_tree.setUpdatesEnabled(False)
+        try:
+            for eid, status in self.entity_status.items():
+                name = self.entity_names.get(eid, f"E{eid}")
+                item = self._tree_items.get(eid)
+                if item is None:
+                    item = QTreeWidgetItem([name, status.state_name, str(status.signal_count)])
+                    self.entity_tree.addTopLevelItem(item)
+                    self._tree_items[eid] = item
+                else:
+                    item.setText(0, name)  # Update name in case it changed
+                    item.setText(1, status.state_name)
+                    item.setText(2, str(status.signal_count))
+        finally:
+            self.entity_tree.setUpdatesEnabled(True)
 
         # Update plot
-        if HAS_PYQTGRAPH and self.dispatch_times:
-            times = list(range(len(self.dispatch_times)))
-            values = list(self.dispatch_times)
-            self.plot_curve.setData(times, values)
+        if HAS_PYQTGRAPH and self._plot_dirty:
+            self._plot_dirty = False
+            n = self._dispatch_len
+            end = self._dispatch_head + self._plot_cap
+            x, y = self._dispatch_x[:n], self._dispatch_buf[end - n:end]
+            px = self.plot_widget.width()
+            if px > 0 and n > 4 * px:
+                x, y = _m4_downsample(x, y, px)
+            self.plot_curve.setData(x, y)
 
     def _inject_signal(self):
         try:
@@ -1499,7 +1788,7 @@ class ReactorScope(QMainWindow):
 
             cmd = f"inject {target} {signal_id} {payload}"
             self.serial_worker.send_command(cmd)
-            self.log_text.append(f"{tr('msg_inject')} {cmd}")
+            self._append_log(f"{tr('msg_inject')} {cmd}")
 
         except Exception as e:
             QMessageBox.warning(self, tr("error"), tr("msg_invalid", e=e))
@@ -1508,14 +1797,23 @@ class ReactorScope(QMainWindow):
         cmd = self.cmd_input.text().strip()
         if cmd:
             self.serial_worker.send_command(cmd)
-            self.log_text.append(f"{tr('msg_cmd')} {cmd}")
+            self._append_log(f"{tr('msg_cmd')} {cmd}")
             self.cmd_input.clear()
 
     def clear_data(self):
         self.signal_records.clear()
         self.trace_events.clear()
+        self._pending_dispatch.clear()
+        self._raw_buf.clear()
+        del self._raw_times[:]
+        self._pending_events.clear()
+        self._pending_signals.clear()
+        self._pending_log_lines.clear()
         self.dispatch_times.clear()
-        self.signal_times.clear()
+        self._dispatch_head = 0
+        self._dispatch_len = 0
+        self._plot_dirty = True
+        self._rate_bins.clear()
         self.total_signals = 0
         self.entity_status.clear()
         self.entity_names.clear()
@@ -1524,6 +1822,7 @@ class ReactorScope(QMainWindow):
         self.free_heap = 0
         self.min_heap = 0
         self.entity_tree.clear()
+        self._tree_items.clear()
         self.gantt_widget.clear()
         self.flow_widget.clear()
         self.log_text.clear()
@@ -1551,14 +1850,19 @@ class ReactorScope(QMainWindow):
                         ],
                         'dispatch_times': list(self.dispatch_times)
                     }
-                    with open(filename, 'w') as f:
-                        json.dump(data, f, indent=2)
+                    if HAS_ORJSON:
+                        with open(filename, 'wb') as f:
+                            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+                    else:
+                        # Same layout as orjson's OPT_INDENT_2, whichever backend is present
+                        with open(filename, 'w', encoding='utf-8') as f:
+                            f.write(json.dumps(data, indent=2, ensure_ascii=False))
                 else:
-                    with open(filename, 'w') as f:
-                        f.write("timestamp,src_id,dst_id,signal_id,signal_name\n")
-                        for r in self.signal_records:
-                            f.write(f"{r.timestamp},{r.src_id},{r.dst_id},"
-                                   f"{r.signal_id},{r.signal_name}\n")
+                    with open(filename, 'w', newline='', buffering=1 << 20) as f:
+                        w = csv.writer(f)
+                        w.writerow(["timestamp", "src_id", "dst_id", "signal_id", "signal_name"])
+                        w.writerows((r.timestamp, r.src_id, r.dst_id, r.signal_id, r.signal_name)
+                                    for r in self.signal_records)
 
                 QMessageBox.information(self, tr("info"), tr("msg_exported", path=filename))
 
@@ -11,13 +11,17 @@ Features:
 - Code generation (C header and source)
 - Project save/load (JSON format)
 - Bilingual UI (Chinese/English, default: Chinese)
+
+Requires Python 3.10+.
 """
 
 import sys
+import io
 import json
 import math
-from dataclasses import dataclass, field, asdict
-from typing import List, Dict, Optional, Tuple
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict, fields, replace
+from typing import Iterator, List, Dict, Optional, Set, Tuple
 from pathlib import Path
 
 from PySide6.QtWidgets import (
@@ -26,17 +30,27 @@ from PySide6.QtWidgets import (
     QGraphicsLineItem, QGraphicsTextItem, QGraphicsPathItem,
     QToolBar, QDockWidget, QTreeWidget, QTreeWidgetItem,
     QDialog, QDialogButtonBox, QFormLayout, QLineEdit, QSpinBox,
-    QComboBox, QTextEdit, QListWidget, QListWidgetItem, QPushButton,
+    QComboBox, QPlainTextEdit, QListWidget, QListWidgetItem, QPushButton,
     QFileDialog, QMessageBox, QSplitter, QLabel, QGroupBox,
-    QTableWidget, QTableWidgetItem, QHeaderView, QMenu, QInputDialog,
+    QTableView, QStyledItemDelegate, QHeaderView, QMenu, QInputDialog,
     QStatusBar, QToolButton
 )
-from PySide6.QtCore import Qt, QPointF, QRectF, QLineF, Signal, QTimer
+from PySide6.QtCore import (
+    Qt, QPointF, QRectF, QLineF, Signal, QTimer, QEvent, QAbstractTableModel, QModelIndex
+)
 from PySide6.QtGui import (
     QAction, QPainter, QPen, QBrush, QColor, QFont,
-    QPainterPath, QPolygonF, QKeySequence, QIcon, QTransform
+    QPainterPath, QPainterPathStroker, QPolygonF, QKeySequence, QIcon, QTransform
 )
 
+try:
+    import orjson  # optional, faster project save/load
+    HAS_ORJSON = True
+    _loads = orjson.loads
+except ImportError:
+    HAS_ORJSON = False
+    _loads = json.loads  # also accepts UTF-8 bytes
+
 
 # =============================================================================
 # Internationalization (i18n)
@@ -134,30 +148,37 @@ _TR = {
     "error": {"zh": "错误", "en": "Error"},
 }
 
+def _resolve_strings(lang: str) -> Dict[str, str]:
+    """Flatten _TR to key -> text for one language."""
+    return {key: texts.get(lang, key) for key, texts in _TR.items()}
+
+_strings = _resolve_strings(_lang)  # Strings for the current language
+
 def tr(key: str, **kw) -> str:
     """Get translated string."""
-    s = _TR.get(key, {}).get(_lang, key)
+    s = _strings.get(key, key)
     return s.format(**kw) if kw else s
 
 def set_lang(lang: str):
     """Set language: 'zh' or 'en'."""
-    global _lang
+    global _lang, _strings
     if lang in ("zh", "en"):
         _lang = lang
+        _strings = _resolve_strings(lang)
 
 
 # =============================================================================
 # Data Models
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class SignalDef:
     """Signal definition"""
     id: int
     name: str
     description: str = ""
 
-@dataclass
+@dataclass(slots=True)
 class RuleDef:
     """Transition rule definition"""
     signal_id: int
@@ -166,7 +187,7 @@ class RuleDef:
     next_state_name: str
     action_name: str = ""
 
-@dataclass
+@dataclass(slots=True)
 class StateDef:
     """State definition"""
     id: int
@@ -187,7 +208,27 @@ class EntityDef:
     states: List[StateDef] = field(default_factory=list)
     signals: List[SignalDef] = field(default_factory=list)
 
-@dataclass
+    def __post_init__(self):
+        # Next free state ID; plain attribute so it is not saved with the project
+        self._next_state_id = max((s.id for s in self.states), default=0) + 1
+        self._actions: Optional[List[str]] = None
+
+    def actions(self) -> List[str]:
+        """Action function names in declaration order, kept until invalidate_actions()"""
+        if self._actions is None:
+            self._actions = list(dict.fromkeys(
+                action
+                for state in self.states
+                for action in (state.on_entry, state.on_exit, *(r.action_name for r in state.rules))
+                if action
+            ))
+        return self._actions
+
+    def invalidate_actions(self):
+        """Call after changing a state's entry/exit action or rules"""
+        self._actions = None
+
+@dataclass(slots=True)
 class Project:
     """Project definition"""
     name: str = "Untitled"
@@ -195,29 +236,95 @@ class Project:
     entities: List[EntityDef] = field(default_factory=list)
 
 
+# Rule fields that older or hand-written project files may omit
+_RULE_DEFAULTS = {
+    'signal_id': 0,
+    'signal_name': '',
+    'next_state': 0,
+    'next_state_name': '',
+    'action_name': '',
+}
+
+
+_RULE_FIELDS = frozenset(f.name for f in fields(RuleDef))
+_STATE_FIELDS = frozenset(f.name for f in fields(StateDef))
+_ENTITY_FIELDS = frozenset(f.name for f in fields(EntityDef))
+_SIGNAL_FIELDS = frozenset(f.name for f in fields(SignalDef))
+
+
+def _known(data: dict, names: frozenset) -> dict:
+    """Drop keys the dataclass does not define, so newer or hand-edited files still load"""
+    return {k: v for k, v in data.items() if k in names}
+
+
+def _state_from_dict(state_data: dict) -> StateDef:
+    rules = [RuleDef(**{**_RULE_DEFAULTS, **_known(r, _RULE_FIELDS)})
+             for r in state_data.get('rules', [])]
+    return StateDef(**{**_known(state_data, _STATE_FIELDS), 'rules': rules})
+
+
+def _entity_from_dict(ent_data: dict) -> EntityDef:
+    return EntityDef(**{
+        **_known(ent_data, _ENTITY_FIELDS),
+        'states': [_state_from_dict(s) for s in ent_data.get('states', [])],
+        'signals': [SignalDef(**_known(sig, _SIGNAL_FIELDS)) for sig in ent_data.get('signals', [])],
+    })
+
+
+def project_from_dict(data: dict) -> Project:
+    """Build a Project from the dict form written by asdict()"""
+    return Project(
+        name=data.get('name', 'Untitled'),
+        version=data.get('version', '1.0'),
+        entities=[_entity_from_dict(e) for e in data.get('entities', [])]
+    )
+
+
 # =============================================================================
 # Graphics Items
 # =============================================================================
 
+# Local bindings for the math used on every transition update
+_hypot = math.hypot
+
+# Arrow head barbs are the end tangent rotated by 60 and 120 degrees
+_PI_3, _TWO_PI_3 = math.pi / 3, 2 * math.pi / 3
+_SIN_PI_3, _COS_PI_3 = math.sin(_PI_3), math.cos(_PI_3)
+_SIN_TWO_PI_3, _COS_TWO_PI_3 = math.sin(_TWO_PI_3), math.cos(_TWO_PI_3)
+
 class StateItem(QGraphicsEllipseItem):
     """Visual representation of a state"""
 
+    # Shared appearance
+    _BRUSH_NORMAL = QBrush(QColor(240, 248, 255))
+    _BRUSH_HOVER = QBrush(QColor(173, 216, 230))
+    _PEN_NORMAL = QPen(QColor(70, 130, 180), 2)
+    _PEN_INITIAL = QPen(QColor(34, 139, 34), 3)
+    _PEN_SOURCE = QPen(QColor(255, 165, 0), 3)  # Transition source highlight
+    _FONT: Optional[QFont] = None  # Created with the first item, once Qt is up
+
     def __init__(self, state: StateDef, parent=None):
         super().__init__(-50, -30, 100, 60, parent)
         self.state = state
         self.setPos(state.x, state.y)
 
         # Appearance
-        self.setBrush(QBrush(QColor(240, 248, 255)))
-        self.setPen(QPen(QColor(70, 130, 180), 2))
+        self.setBrush(self._BRUSH_NORMAL)
+        self.setPen(self._PEN_NORMAL)
 
         # Label
         self.label = QGraphicsTextItem(state.name, self)
         self.label.setDefaultTextColor(QColor(0, 0, 0))
-        font = QFont("Arial", 10, QFont.Bold)
-        self.label.setFont(font)
+        if StateItem._FONT is None:
+            StateItem._FONT = QFont("Arial", 10, QFont.Bold)
+        self.label.setFont(StateItem._FONT)
+        self._measure_label()
         self._center_label()
 
+        # Keep rasterized pixels between repaints; redrawn only when the item changes
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+        self.label.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+
         # Make interactive
         self.setFlags(
             QGraphicsItem.ItemIsMovable |
@@ -229,49 +336,61 @@ class StateItem(QGraphicsEllipseItem):
         # Enable context menu
         self.setAcceptedMouseButtons(Qt.LeftButton | Qt.RightButton)
 
-        # Connected transitions
-        self.transitions_out: List['TransitionItem'] = []
-        self.transitions_in: List['TransitionItem'] = []
+        # Connected transitions (dicts used as ordered sets)
+        self.transitions_out: Dict['TransitionItem', None] = {}
+        self.transitions_in: Dict['TransitionItem', None] = {}
 
-    def _center_label(self):
+    def _measure_label(self):
+        """Cache the label size; only changes with its text"""
         rect = self.label.boundingRect()
-        self.label.setPos(-rect.width() / 2, -rect.height() / 2)
+        self._lw, self._lh = rect.width(), rect.height()
+
+    def _center_label(self):
+        self.label.setPos(-self._lw / 2, -self._lh / 2)
 
     def set_name(self, name: str):
         self.state.name = name
         self.label.setPlainText(name)
+        self._measure_label()
         self._center_label()
 
     def set_initial(self, is_initial: bool):
         if is_initial:
-            self.setPen(QPen(QColor(34, 139, 34), 3))
+            self.setPen(self._PEN_INITIAL)
         else:
-            self.setPen(QPen(QColor(70, 130, 180), 2))
+            self.setPen(self._PEN_NORMAL)
 
     def itemChange(self, change, value):
+        if change == QGraphicsItem.ItemPositionChange:
+            # Keep states on whole scene units; sub-unit mouse jitter then
+            # leaves the position unchanged and triggers no transition updates
+            return QPointF(round(value.x()), round(value.y()))
         if change == QGraphicsItem.ItemPositionHasChanged:
             # Update state position
-            self.state.x = self.pos().x()
-            self.state.y = self.pos().y()
-            # Update connected transitions
-            for trans in self.transitions_out + self.transitions_in:
-                trans.update_position()
+            pos = self.pos()
+            self.state.x = pos.x()
+            self.state.y = pos.y()
+            # Update connected transitions (coalesced by the scene)
+            scene = self.scene()
+            if scene is not None:
+                scene.schedule_refresh([*self.transitions_out, *self.transitions_in])
         return super().itemChange(change, value)
 
     def hoverEnterEvent(self, event):
-        self.setBrush(QBrush(QColor(173, 216, 230)))
+        self.setBrush(self._BRUSH_HOVER)
         super().hoverEnterEvent(event)
 
     def hoverLeaveEvent(self, event):
-        self.setBrush(QBrush(QColor(240, 248, 255)))
+        self.setBrush(self._BRUSH_NORMAL)
         super().hoverLeaveEvent(event)
 
     def mouseDoubleClickEvent(self, event):
         # Call super first, before any operation that might delete this item
         super().mouseDoubleClickEvent(event)
         # Open state editor
-        if self.scene() and hasattr(self.scene(), 'edit_state'):
-            self.scene().edit_state(self)
+        scene = self.scene()
+        if scene is not None and hasattr(scene, 'edit_state'):
+            scene.edit_state(self)
 
     def contextMenuEvent(self, event):
         """Right-click context menu for quick actions"""
@@ -285,7 +404,7 @@ class StateItem(QGraphicsEllipseItem):
 
         # Edit action
         edit_action = menu.addAction(tr("studio.ctx_edit_state"))
-        edit_action.triggered.connect(lambda: self.scene().edit_state(self) if self.scene() else None)
+        edit_action.triggered.connect(lambda: self._edit_self())
 
         # Set as initial
         set_initial_action = menu.addAction(tr("studio.ctx_set_initial"))
@@ -301,37 +420,66 @@ class StateItem(QGraphicsEllipseItem):
 
     def _start_transition_from_here(self):
         """Start transition creation from this state"""
-        if self.scene():
-            self.scene().set_transition_mode(True)
-            self.scene()._set_transition_source(self)
+        scene = self.scene()
+        if scene is None:
+            return
+        scene.set_transition_mode(True)
+        scene._set_transition_source(self)
+
+    def _edit_self(self):
+        """Open the state editor for this state"""
+        scene = self.scene()
+        if scene is not None:
+            scene.edit_state(self)
 
     def _set_as_initial(self):
         """Set this state as the initial state"""
-        if self.scene() and self.scene().entity:
-            # Reset all states' visual
-            for item in self.scene().state_items.values():
-                item.set_initial(False)
-            # Set this as initial
-            self.scene().entity.initial_state = self.state.id
-            self.set_initial(True)
+        scene = self.scene()
+        if scene is None or not scene.entity:
+            return
+        # Reset all states' visual
+        for item in scene.state_items.values():
+            item.set_initial(False)
+        # Set this as initial
+        scene.entity.initial_state = self.state.id
+        self.set_initial(True)
 
     def _delete_self(self):
         """Delete this state"""
-        if self.scene():
-            self.scene()._delete_state(self)
+        scene = self.scene()
+        if scene is not None:
+            scene._delete_state(self)
 
 
 class TransitionItem(QGraphicsPathItem):
     """Visual representation of a transition (arrow)"""
 
-    def __init__(self, rule: RuleDef, from_state: StateItem, to_state: StateItem):
+    # Shared appearance
+    _PEN = QPen(QColor(100, 100, 100), 2)
+    _LABEL_COLOR = QColor(100, 100, 100)
+    _LABEL_FONT: Optional[QFont] = None  # Created with the first item, once Qt is up
+
+    def __init__(self, rule: RuleDef, from_state: StateItem, to_state: StateItem,
+                 defer_update: bool = False):
         super().__init__()
         self.rule = rule
         self.from_state = from_state
         self.to_state = to_state
 
+        # Geometry cache; the path is only rebuilt when an input changes
+        self._cached_p1: Optional[QPointF] = None
+        self._cached_p2: Optional[QPointF] = None
+        self._cached_sibling_sig: Optional[Tuple[int, int, int]] = None
+        self._bez: Optional[Tuple[QPointF, QPointF, QPointF]] = None  # start, ctrl, end
+        self._bounding_rect = QRectF()
+        self._shape = QPainterPath()
+
         # Appearance
-        self.setPen(QPen(QColor(100, 100, 100), 2))
+        self.setPen(self._PEN)
+
+        # Hit-test outline, a little wider than the pen so thin arrows are easy to pick
+        self._stroker = QPainterPathStroker()
+        self._stroker.setWidth(self.pen().widthF() + 4)
 
         # Arrow head
         self.arrow_size = 10
@@ -341,57 +489,96 @@ class TransitionItem(QGraphicsPathItem):
 
         # Label
         self.label = QGraphicsTextItem(rule.signal_name, self)
-        self.label.setDefaultTextColor(QColor(100, 100, 100))
-        font = QFont("Arial", 8)
-        self.label.setFont(font)
+        self.label.setDefaultTextColor(self._LABEL_COLOR)
+        if TransitionItem._LABEL_FONT is None:
+            TransitionItem._LABEL_FONT = QFont("Arial", 8)
+        self.label.setFont(TransitionItem._LABEL_FONT)
+        self._measure_label()
+
+        # Keep rasterized pixels between repaints; redrawn only when the path changes
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+        self.label.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
 
         # Connect to states
-        from_state.transitions_out.append(self)
-        to_state.transitions_in.append(self)
+        from_state.transitions_out[self] = None
+        to_state.transitions_in[self] = None
 
-        self.update_position()
+        # Register in the scene's adjacency map (states are already in the scene)
+        self._edge_key = (from_state.state.id, to_state.state.id)
+        scene = from_state.scene()
+        if scene is not None:
+            scene._edges.setdefault(self._edge_key, []).append(self)
+
+        # Bulk loads lay out all siblings once they exist
+        if not defer_update:
+            self.update_position()
 
         # Make selectable
         self.setFlags(QGraphicsItem.ItemIsSelectable)
 
-    def _get_all_transitions_between_states(self):
-        """Get all transitions between these two states (both directions)"""
-        state_a = self.from_state
-        state_b = self.to_state
-
-        transitions = []
+    def _get_all_transitions_between_states(self) -> Tuple[List['TransitionItem'], List['TransitionItem']]:
+        """Get all transitions between these two states as (A → B, B → A)"""
+        scene = self.from_state.scene()
+        if scene is None:
+            return [], []
+        a, b = self._edge_key
+        return scene._edges.get((a, b), []), scene._edges.get((b, a), [])
 
-        # A → B transitions
-        for trans in state_a.transitions_out:
-            if trans.to_state == state_b:
-                transitions.append(('ab', trans))
-
-        # B → A transitions
-        for trans in state_b.transitions_out:
-            if trans.to_state == state_a:
-                transitions.append(('ba', trans))
-
-        return transitions
-
-    def _get_perpendicular_offset(self, p1: QPointF, p2: QPointF, offset: float) -> QPointF:
-        """Get perpendicular offset vector"""
-        dx = p2.x() - p1.x()
-        dy = p2.y() - p1.y()
-        length = math.sqrt(dx * dx + dy * dy)
-        if length < 1:
-            return QPointF(0, 0)
-        # Perpendicular unit vector (rotate 90 degrees)
-        return QPointF(-dy / length * offset, dx / length * offset)
+    def _measure_label(self):
+        """Cache the label size; only changes with its text"""
+        rect = self.label.boundingRect()
+        self._lw, self._lh = rect.width(), rect.height()
+
+    def invalidate_cache(self):
+        """Force the next update_position to rebuild the path"""
+        self._cached_sibling_sig = None
+
+    def boundingRect(self) -> QRectF:
+        return self._bounding_rect
+
+    def shape(self) -> QPainterPath:
+        return self._shape
+
+    def _set_cached_path(self, path: QPainterPath, start: QPointF, ctrl: QPointF, end: QPointF):
+        """Set the path and refresh the cached bounding rect and hit-test shape"""
+        self.prepareGeometryChange()
+        self._bez = (start, ctrl, end)
+        # A quadratic bezier stays inside the hull of its control points and
+        # the arrow head within arrow_size of the end point
+        xs = (start.x(), ctrl.x(), end.x())
+        ys = (start.y(), ctrl.y(), end.y())
+        margin = self._stroker.width() / 2 + self.arrow_size
+        left, top = min(xs) - margin, min(ys) - margin
+        self._bounding_rect = QRectF(left, top, max(xs) + margin - left, max(ys) + margin - top)
+
+        self._shape = self._stroker.createStroke(path)
+        self.setPath(path)
 
     def update_position(self):
         """Update arrow path based on state positions"""
         p1 = self.from_state.scenePos()
         p2 = self.to_state.scenePos()
 
+        # Get all transitions between these two states and my index in my direction
+        ab_transitions, ba_transitions = self._get_all_transitions_between_states()
+        try:
+            my_index = ab_transitions.index(self)
+        except ValueError:
+            my_index = 0
+        ab_count = len(ab_transitions)
+        ba_count = len(ba_transitions)
+        total_count = ab_count + ba_count
+
+        # Nothing that shapes the path has changed
+        sibling_sig = (ab_count, ba_count, my_index)
+        if (sibling_sig == self._cached_sibling_sig
+                and p1 == self._cached_p1 and p2 == self._cached_p2):
+            return
+
         # Calculate direction
         dx = p2.x() - p1.x()
         dy = p2.y() - p1.y()
-        length = math.sqrt(dx * dx + dy * dy)
+        length = _hypot(dx, dy)
 
         if length < 1:
             return
@@ -403,36 +590,18 @@ class TransitionItem(QGraphicsPathItem):
         start = QPointF(p1.x() + ux * 50, p1.y() + uy * 30)
         end = QPointF(p2.x() - ux * 50, p2.y() - uy * 30)
 
-        # Get all transitions between these two states
-        all_transitions = self._get_all_transitions_between_states()
-        total_count = len(all_transitions)
-
         path = QPainterPath()
 
         if total_count <= 1:
             # Single transition - straight line
             path.moveTo(start)
             path.lineTo(end)
-            arrow_angle = math.atan2(-dy, dx)
-            label_pos = QPointF((start.x() + end.x()) / 2, (start.y() + end.y()) / 2)
+            # Arrow head direction as (sin, cos) of the line angle
+            sin_a, cos_a = -uy, ux
+            ctrl = QPointF((start.x() + end.x()) / 2, (start.y() + end.y()) / 2)
+            label_pos = ctrl
         else:
-            # Multiple transitions - find our index and calculate offset
-            my_direction = 'ab'  # This transition goes from_state -> to_state
-
-            # Separate by direction
-            ab_transitions = [t for d, t in all_transitions if d == 'ab']
-            ba_transitions = [t for d, t in all_transitions if d == 'ba']
-
-            # Find my index within my direction group
-            try:
-                my_index = ab_transitions.index(self)
-            except ValueError:
-                my_index = 0
-
-            ab_count = len(ab_transitions)
-            ba_count = len(ba_transitions)
-
-            # Calculate offset for this transition
+            # Multiple transitions - calculate offset for this transition
             # AB transitions curve one way, BA transitions curve the other
             # Within each group, spread them out
 
@@ -450,50 +619,61 @@ class TransitionItem(QGraphicsPathItem):
                 center_offset = (ab_count - 1) / 2
                 offset = (my_index - center_offset) * 20
 
-            # Get perpendicular offset for the control point
-            perp = self._get_perpendicular_offset(p1, p2, offset)
-
             # Control point at midpoint + perpendicular offset
-            mid = QPointF((p1.x() + p2.x()) / 2, (p1.y() + p2.y()) / 2)
-            ctrl = QPointF(mid.x() + perp.x(), mid.y() + perp.y())
+            # (unit vector rotated 90 degrees)
+            ctrl = QPointF(
+                (p1.x() + p2.x()) / 2 - uy * offset,
+                (p1.y() + p2.y()) / 2 + ux * offset
+            )
 
             # Draw quadratic bezier curve
             path.moveTo(start)
             path.quadTo(ctrl, end)
 
-            # Arrow head angle - tangent at end of curve
-            arrow_angle = math.atan2(-(end.y() - ctrl.y()), end.x() - ctrl.x())
+            # Arrow head direction - tangent at end of curve
+            tx, ty = end.x() - ctrl.x(), end.y() - ctrl.y()
+            tl = _hypot(tx, ty)
+            sin_a, cos_a = (-ty / tl, tx / tl) if tl else (0.0, 1.0)
 
             # Label position - at the control point
             label_pos = ctrl
 
         # Draw arrow head
+        size = self.arrow_size
+        ex, ey = end.x(), end.y()
+        # sin/cos of (angle - 60°) and (angle - 120°) by angle subtraction
         arrow_p1 = QPointF(
-            end.x() + math.sin(arrow_angle - math.pi / 3) * self.arrow_size,
-            end.y() + math.cos(arrow_angle - math.pi / 3) * self.arrow_size
+            ex + (sin_a * _COS_PI_3 - cos_a * _SIN_PI_3) * size,
+            ey + (cos_a * _COS_PI_3 + sin_a * _SIN_PI_3) * size
         )
         arrow_p2 = QPointF(
-            end.x() + math.sin(arrow_angle - math.pi + math.pi / 3) * self.arrow_size,
-            end.y() + math.cos(arrow_angle - math.pi + math.pi / 3) * self.arrow_size
+            ex + (sin_a * _COS_TWO_PI_3 - cos_a * _SIN_TWO_PI_3) * size,
+            ey + (cos_a * _COS_TWO_PI_3 + sin_a * _SIN_TWO_PI_3) * size
         )
 
-        path.moveTo(end)
-        path.lineTo(arrow_p1)
-        path.moveTo(end)
+        # Both barbs as one open polyline through the tip
+        path.moveTo(arrow_p1)
+        path.lineTo(end)
         path.lineTo(arrow_p2)
 
-        self.setPath(path)
+        self._set_cached_path(path, start, ctrl, end)
+        self._cached_p1 = p1
+        self._cached_p2 = p2
+        self._cached_sibling_sig = sibling_sig
 
         # Position label
-        label_rect = self.label.boundingRect()
         self.label.setPos(
-            label_pos.x() - label_rect.width() / 2,
-            label_pos.y() - label_rect.height() - 2
+            label_pos.x() - self._lw / 2,
+            label_pos.y() - self._lh - 2
         )
 
     def set_signal_name(self, name: str):
         self.rule.signal_name = name
         self.label.setPlainText(name)
+        self._measure_label()
+        # Re-centre the label on its new width
+        self.invalidate_cache()
+        self.update_position()
 
     def contextMenuEvent(self, event):
         """Right-click context menu for transition"""
@@ -524,8 +704,9 @@ class TransitionItem(QGraphicsPathItem):
 
     def _delete_self(self):
         """Delete this transition"""
-        if self.scene():
-            self.scene()._delete_transition(self)
+        scene = self.scene()
+        if scene is not None:
+            scene._delete_transition(self)
 
 
 # =============================================================================
@@ -538,13 +719,37 @@ class StateMachineScene(QGraphicsScene):
     state_selected = Signal(StateDef)
     transition_selected = Signal(RuleDef)
     status_message = Signal(str)  # For status bar updates
+    items_deleted = Signal(list)  # StateDefs removed; empty if only transitions were
+
+    BSP_INDEX_THRESHOLD = 500  # States above which the BSP item index is used
+    SCENE_MARGIN = 500  # Free space kept around the items for scrolling and new states
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setSceneRect(-2000, -2000, 4000, 4000)
+        # Scene rect follows the items (plus SCENE_MARGIN), refreshed after edits settle
+        self._rect_timer = QTimer(self)
+        self._rect_timer.setSingleShot(True)
+        self._rect_timer.setInterval(200)
+        self._rect_timer.timeout.connect(self._update_scene_rect)
+        self._update_scene_rect()
+        # Editor scenes hold few items that move often; a BSP index would be
+        # rebuilt on every drag step
+        self.setItemIndexMethod(QGraphicsScene.NoIndex)
         self.entity: Optional[EntityDef] = None
         self.state_items: Dict[int, StateItem] = {}
-        self.transition_items: List[TransitionItem] = []
+        self.transition_items: Set[TransitionItem] = set()
+        # Transitions keyed by (from_id, to_id) for sibling lookups
+        self._edges: Dict[Tuple[int, int], List[TransitionItem]] = {}
+
+        # Transitions waiting for a path update on the next event loop pass
+        self._dirty_transitions: Set[TransitionItem] = set()
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(0)
+        self._refresh_timer.timeout.connect(self._flush_refresh)
+
+        # Nesting depth of _bulk_update
+        self._bulk_depth = 0
 
         # Transition mode (two-click method)
         self.transition_mode = False
@@ -552,30 +757,53 @@ class StateMachineScene(QGraphicsScene):
 
     def load_entity(self, entity: EntityDef):
         """Load entity into scene"""
-        self.clear()
-        self.entity = entity
-        self.state_items.clear()
-        self.transition_items.clear()
-
-        # Create state items
-        for state in entity.states:
-            item = StateItem(state)
-            self.addItem(item)
-            self.state_items[state.id] = item
+        with self._bulk_update():
+            self.clear()
+            self.entity = entity
+
+            # Populate without an index; a BSP tree is built once afterwards if needed
+            self.setItemIndexMethod(QGraphicsScene.NoIndex)
+            self.state_items.clear()
+            self.transition_items.clear()
+            self._edges.clear()
+            self._dirty_transitions.clear()
+            self._refresh_timer.stop()
+
+            # Create state items
+            for state in entity.states:
+                item = StateItem(state)
+                self.addItem(item)
+                self.state_items[state.id] = item
 
             # Mark initial state
-            if state.id == entity.initial_state:
-                item.set_initial(True)
+            initial = self.state_items.get(entity.initial_state)
+            if initial is not None:
+                initial.set_initial(True)
 
-        # Create transition items
-        for state in entity.states:
-            for rule in state.rules:
-                if rule.next_state > 0 and rule.next_state in self.state_items:
-                    from_item = self.state_items[state.id]
-                    to_item = self.state_items[rule.next_state]
-                    trans = TransitionItem(rule, from_item, to_item)
+            # Create transition items
+            state_items = self.state_items
+            for state in entity.states:
+                from_item = state_items[state.id]
+                for rule in state.rules:
+                    to_item = state_items.get(rule.next_state) if rule.next_state > 0 else None
+                    if to_item is None:
+                        continue
+                    trans = TransitionItem(rule, from_item, to_item, defer_update=True)
                     self.addItem(trans)
-                    self.transition_items.append(trans)
+                    self.transition_items.add(trans)
+
+            # Lay out each transition once, with its full sibling group known
+            for siblings in self._edges.values():
+                for trans in siblings:
+                    trans.update_position()
+
+            # Very large machines benefit from spatial lookups again
+            if len(entity.states) > self.BSP_INDEX_THRESHOLD:
+                self.setItemIndexMethod(QGraphicsScene.BspTreeIndex)
+
+        # Outside the bulk block: sceneRectChanged must reach the views so
+        # their scroll ranges follow the new entity
+        self._update_scene_rect(reset=True)
 
     def add_state(self, x: float, y: float) -> StateItem:
         """Add new state at position"""
@@ -583,8 +811,8 @@ class StateMachineScene(QGraphicsScene):
             return None
 
         # Generate unique ID
-        max_id = max([s.id for s in self.entity.states], default=0)
-        new_id = max_id + 1
+        new_id = self.entity._next_state_id
+        self.entity._next_state_id += 1
 
         state = StateDef(
             id=new_id,
@@ -597,48 +825,118 @@ class StateMachineScene(QGraphicsScene):
         item = StateItem(state)
         self.addItem(item)
         self.state_items[state.id] = item
+        self._rect_timer.start()
 
         return item
 
     def delete_selected(self):
         """Delete selected items"""
-        for item in self.selectedItems():
-            if isinstance(item, StateItem):
-                self._delete_state(item)
-            elif isinstance(item, TransitionItem):
-                self._delete_transition(item)
+        selected = self.selectedItems()
+        states = [i for i in selected if isinstance(i, StateItem)]
+        # Selected transitions plus every transition of a selected state, each once
+        doomed = dict.fromkeys(i for i in selected if isinstance(i, TransitionItem))
+        for item in states:
+            doomed.update(dict.fromkeys(item.transitions_out))
+            doomed.update(dict.fromkeys(item.transitions_in))
+
+        if not states and not doomed:
+            return
+        with self._bulk_update():
+            self._delete_transitions_batch(list(doomed))
+            for item in states:
+                self._delete_state_no_cascade(item)
+        self.items_deleted.emit([item.state for item in states])
+
+    @contextmanager
+    def _bulk_update(self):
+        """Hold view repaints and scene signals while many items change"""
+        self._bulk_depth += 1
+        if self._bulk_depth == 1:
+            self.blockSignals(True)
+            for view in self.views():
+                view.setUpdatesEnabled(False)
+        try:
+            yield
+        finally:
+            self._bulk_depth -= 1
+            if self._bulk_depth == 0:
+                self.blockSignals(False)
+                for view in self.views():
+                    view.setUpdatesEnabled(True)
+                    view.viewport().update()
 
     def _delete_state(self, item: StateItem):
-        # Remove connected transitions
-        for trans in item.transitions_out + item.transitions_in:
-            self._delete_transition(trans)
-
-        # Remove from entity
+        with self._bulk_update():
+            # Remove connected transitions in one pass (a self-loop is in both maps)
+            self._delete_transitions_batch(
+                list(dict.fromkeys([*item.transitions_out, *item.transitions_in]))
+            )
+            self._delete_state_no_cascade(item)
+        self.items_deleted.emit([item.state])
+
+    def _delete_state_no_cascade(self, item: StateItem):
+        """Remove a state whose transitions are already gone"""
         self.entity.states = [s for s in self.entity.states if s.id != item.state.id]
+        self.entity.invalidate_actions()
         del self.state_items[item.state.id]
         self.removeItem(item)
+        self._rect_timer.start()
 
     def _delete_transition(self, item: TransitionItem):
-        # Store references before removal
-        from_state = item.from_state
-        to_state = item.to_state
-
-        # Remove from states
-        if item in from_state.transitions_out:
-            from_state.transitions_out.remove(item)
-        if item in to_state.transitions_in:
-            to_state.transitions_in.remove(item)
+        self._delete_transitions_batch([item])
+        self.items_deleted.emit([])
 
-        # Remove rule from state
+    def _delete_transitions_batch(self, items: List[TransitionItem]):
+        """Delete transitions and their rules, filtering each state's rules once"""
+        if not items:
+            return
+        rule_ids = {id(trans.rule) for trans in items}
         for state in self.entity.states:
-            state.rules = [r for r in state.rules if r is not item.rule]
-
-        if item in self.transition_items:
-            self.transition_items.remove(item)
+            state.rules = [r for r in state.rules if id(r) not in rule_ids]
+        self.entity.invalidate_actions()
+
+        pairs = {(trans.from_state, trans.to_state) for trans in items}
+        for trans in items:
+            self._detach_transition(trans)
+
+        # Update all remaining transitions between the affected states
+        for from_state, to_state in pairs:
+            self._refresh_transitions_between(from_state, to_state)
+
+    def _detach_transition(self, item: TransitionItem):
+        """Remove a transition item from its states, the scene and all bookkeeping"""
+        item.from_state.transitions_out.pop(item, None)
+        item.to_state.transitions_in.pop(item, None)
+        self.transition_items.discard(item)
+        self._dirty_transitions.discard(item)
+        siblings = self._edges.get(item._edge_key)
+        if siblings is not None and item in siblings:
+            siblings.remove(item)
+            if not siblings:
+                del self._edges[item._edge_key]
         self.removeItem(item)
 
-        # Update all remaining transitions between these states
-        self._refresh_transitions_between(from_state, to_state)
+    def schedule_refresh(self, transitions: List[TransitionItem]):
+        """Queue transitions for one path update once pending moves are processed"""
+        self._dirty_transitions.update(transitions)
+        if not self._refresh_timer.isActive():
+            self._refresh_timer.start()
+        self._rect_timer.start()
+
+    def _update_scene_rect(self, reset: bool = False):
+        """Fit the scene rect to the items; it only grows unless reset, because a
+        shrinking rect re-centres the view and shifts everything on screen"""
+        m = self.SCENE_MARGIN
+        rect = self.itemsBoundingRect().adjusted(-m, -m, m, m)
+        if not reset:
+            rect = rect.united(self.sceneRect())
+        self.setSceneRect(rect)
+
+    def _flush_refresh(self):
+        dirty = self._dirty_transitions
+        self._dirty_transitions = set()
+        for trans in dirty:
+            trans.update_position()
 
     def set_transition_mode(self, enabled: bool):
         """Enable/disable transition creation mode"""
@@ -652,7 +950,7 @@ class StateMachineScene(QGraphicsScene):
         """Clear the transition source selection"""
         if self.transition_source:
             # Reset visual highlight
-            self.transition_source.setPen(QPen(QColor(70, 130, 180), 2))
+            self.transition_source.setPen(StateItem._PEN_NORMAL)
             self.transition_source = None
 
     def _set_transition_source(self, state_item: StateItem):
@@ -660,7 +958,7 @@ class StateMachineScene(QGraphicsScene):
         self._clear_transition_source()
         self.transition_source = state_item
         # Highlight source state
-        state_item.setPen(QPen(QColor(255, 165, 0), 3))  # Orange highlight
+        state_item.setPen(StateItem._PEN_SOURCE)  # Orange highlight
         self.status_message.emit(tr("trans_source", name=state_item.state.name))
 
     def _complete_transition(self, target_item: StateItem):
@@ -680,7 +978,7 @@ class StateMachineScene(QGraphicsScene):
         # Create visual transition
         trans = TransitionItem(rule, self.transition_source, target_item)
         self.addItem(trans)
-        self.transition_items.append(trans)
+        self.transition_items.add(trans)
 
         # Update ALL transitions between these two states (both directions)
         self._refresh_transitions_between(self.transition_source, target_item)
@@ -692,14 +990,9 @@ class StateMachineScene(QGraphicsScene):
 
     def _refresh_transitions_between(self, state_a: StateItem, state_b: StateItem):
         """Refresh all transitions between two states"""
-        # A → B
-        for trans in state_a.transitions_out:
-            if trans.to_state == state_b:
-                trans.update_position()
-        # B → A
-        for trans in state_b.transitions_out:
-            if trans.to_state == state_a:
-                trans.update_position()
+        a, b = state_a.state.id, state_b.state.id
+        for trans in self._edges.get((a, b), []) + self._edges.get((b, a), []):
+            trans.update_position()
 
     def cancel_transition_mode(self):
         """Cancel transition mode entirely"""
@@ -750,14 +1043,146 @@ class StateMachineScene(QGraphicsScene):
 # Dialogs
 # =============================================================================
 
+class RulesModel(QAbstractTableModel):
+    """Table model over the transition rules of one state"""
+
+    COL_SIGNAL, COL_NEXT, COL_ACTION, COL_DELETE = range(4)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.state: Optional[StateDef] = None
+        self.entity: Optional[EntityDef] = None
+        self._state_names: Dict[int, str] = {}
+
+    def set_state(self, state: StateDef, entity: EntityDef):
+        self.beginResetModel()
+        self.state = state
+        self.entity = entity
+        # States cannot change while the editor is open; list them once per load
+        self._state_names = {s.id: s.name for s in entity.states}
+        self.endResetModel()
+
+    def state_choices(self) -> Dict[int, str]:
+        """Next-state choices as state ID -> name, in entity order"""
+        return self._state_names
+
+    @property
+    def rules(self) -> List[RuleDef]:
+        return self.state.rules if self.state is not None else []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rules)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 4
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return (tr("dlg_signal"), tr("dlg_next_state"), tr("dlg_action"), "")[section]
+        return None
+
+    def flags(self, index):
+        if index.column() == self.COL_DELETE:
+            return Qt.ItemIsEnabled
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        rule = self.rules[index.row()]
+        col = index.column()
+        if role == Qt.DisplayRole or role == Qt.EditRole:
+            if col == self.COL_SIGNAL:
+                return rule.signal_name
+            if col == self.COL_NEXT:
+                if role == Qt.EditRole:
+                    return rule.next_state
+                if not rule.next_state:
+                    return tr("dlg_stay")
+                return self._state_names.get(rule.next_state, rule.next_state_name)
+            if col == self.COL_ACTION:
+                return rule.action_name
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        rule = self.rules[index.row()]
+        col = index.column()
+        if col == self.COL_SIGNAL:
+            rule.signal_name = value
+        elif col == self.COL_NEXT:
+            rule.next_state = value or 0
+            rule.next_state_name = self._state_names.get(rule.next_state, "")
+        elif col == self.COL_ACTION:
+            rule.action_name = value
+            self.entity.invalidate_actions()
+        else:
+            return False
+        self.dataChanged.emit(index, index)
+        return True
+
+    def append_rule(self, rule: RuleDef):
+        row = len(self.rules)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.state.rules.append(rule)
+        self.endInsertRows()
+
+    def removeRows(self, row, count, parent=QModelIndex()):
+        if parent.isValid() or row < 0 or row + count > len(self.rules):
+            return False
+        self.beginRemoveRows(parent, row, row + count - 1)
+        del self.state.rules[row:row + count]
+        self.entity.invalidate_actions()
+        self.endRemoveRows()
+        return True
+
+
+class NextStateDelegate(QStyledItemDelegate):
+    """Combo box editor for the next-state column, created only while editing"""
+
+    def createEditor(self, parent, option, index):
+        combo = QComboBox(parent)
+        combo.addItem(tr("dlg_stay"), 0)
+        for state_id, name in index.model().state_choices().items():
+            combo.addItem(name, state_id)
+        return combo
+
+    def setEditorData(self, editor, index):
+        idx = editor.findData(index.data(Qt.EditRole))
+        if idx >= 0:
+            editor.setCurrentIndex(idx)
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.currentData(), Qt.EditRole)
+
+
+class DeleteRuleDelegate(QStyledItemDelegate):
+    """Paints a red "×" and removes the rule whose cell is clicked"""
+
+    _COLOR = QColor(200, 60, 60)
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        painter.save()
+        painter.setPen(self._COLOR)
+        painter.drawText(option.rect, Qt.AlignCenter, "×")
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            model.removeRow(index.row())
+            return True
+        return False
+
+
 class StateEditorDialog(QDialog):
     """Dialog for editing state properties"""
 
-    def __init__(self, state: StateDef, entity: EntityDef, parent=None):
+    def __init__(self, state: Optional[StateDef] = None, entity: Optional[EntityDef] = None, parent=None):
         super().__init__(parent)
         self.state = state
         self.entity = entity
-        self.setWindowTitle(tr("dlg_edit_state", name=state.name))
         self.setMinimumWidth(500)
 
         layout = QVBoxLayout(self)
@@ -765,29 +1190,21 @@ class StateEditorDialog(QDialog):
         # Basic properties
         form = QFormLayout()
 
-        self.name_edit = QLineEdit(state.name)
+        self.name_edit = QLineEdit()
         form.addRow(tr("dlg_name"), self.name_edit)
 
         self.id_spin = QSpinBox()
         self.id_spin.setRange(1, 255)
-        self.id_spin.setValue(state.id)
         form.addRow(tr("dlg_id"), self.id_spin)
 
         self.parent_combo = QComboBox()
-        self.parent_combo.addItem(tr("dlg_none"), 0)
-        for s in entity.states:
-            if s.id != state.id:
-                self.parent_combo.addItem(s.name, s.id)
-        idx = self.parent_combo.findData(state.parent_id)
-        if idx >= 0:
-            self.parent_combo.setCurrentIndex(idx)
         form.addRow(tr("dlg_parent"), self.parent_combo)
 
-        self.entry_edit = QLineEdit(state.on_entry)
+        self.entry_edit = QLineEdit()
         self.entry_edit.setPlaceholderText("e.g., on_idle_entry")
         form.addRow(tr("dlg_on_entry"), self.entry_edit)
 
-        self.exit_edit = QLineEdit(state.on_exit)
+        self.exit_edit = QLineEdit()
         self.exit_edit.setPlaceholderText("e.g., on_idle_exit")
         form.addRow(tr("dlg_on_exit"), self.exit_edit)
 
@@ -796,11 +1213,17 @@ class StateEditorDialog(QDialog):
         # Rules table
         layout.addWidget(QLabel(tr("dlg_rules")))
 
-        self.rules_table = QTableWidget()
-        self.rules_table.setColumnCount(4)
-        self.rules_table.setHorizontalHeaderLabels([tr("dlg_signal"), tr("dlg_next_state"), tr("dlg_action"), ""])
-        self.rules_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self._populate_rules()
+        self.rules_model = RulesModel(self)
+        self.rules_table = QTableView()
+        self.rules_table.setModel(self.rules_model)
+        self.rules_table.setItemDelegateForColumn(RulesModel.COL_NEXT, NextStateDelegate(self.rules_table))
+        self.rules_table.setItemDelegateForColumn(RulesModel.COL_DELETE, DeleteRuleDelegate(self.rules_table))
+        self.rules_table.verticalHeader().hide()
+        header = self.rules_table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Stretch)
+        # A fixed width; ResizeToContents would measure every row on each change
+        header.setSectionResizeMode(RulesModel.COL_DELETE, QHeaderView.Fixed)
+        header.resizeSection(RulesModel.COL_DELETE, 30)
         layout.addWidget(self.rules_table)
 
         # Add rule button
@@ -814,60 +1237,80 @@ class StateEditorDialog(QDialog):
         buttons.rejected.connect(self.reject)
         layout.addWidget(buttons)
 
-    def _populate_rules(self):
-        self.rules_table.setRowCount(len(self.state.rules))
-        for i, rule in enumerate(self.state.rules):
-            self.rules_table.setItem(i, 0, QTableWidgetItem(rule.signal_name))
+        if state is not None and entity is not None:
+            self.load(state, entity)
 
-            state_combo = QComboBox()
-            state_combo.addItem(tr("dlg_stay"), 0)
-            for s in self.entity.states:
-                state_combo.addItem(s.name, s.id)
-            idx = state_combo.findData(rule.next_state)
-            if idx >= 0:
-                state_combo.setCurrentIndex(idx)
-            self.rules_table.setCellWidget(i, 1, state_combo)
+    def load(self, state: StateDef, entity: EntityDef):
+        """Show another state in the existing widgets"""
+        self.state = state
+        self.entity = entity
+        self.setWindowTitle(tr("dlg_edit_state", name=state.name))
 
-            self.rules_table.setItem(i, 2, QTableWidgetItem(rule.action_name))
+        self.name_edit.setText(state.name)
+        self.id_spin.setValue(state.id)
 
-            del_btn = QPushButton("×")
-            del_btn.setMaximumWidth(30)
-            del_btn.clicked.connect(lambda checked, row=i: self._delete_rule(row))
-            self.rules_table.setCellWidget(i, 3, del_btn)
+        self.parent_combo.clear()
+        self.parent_combo.addItem(tr("dlg_none"), 0)
+        for s in entity.states:
+            if s.id != state.id:
+                self.parent_combo.addItem(s.name, s.id)
+        idx = self.parent_combo.findData(state.parent_id)
+        if idx >= 0:
+            self.parent_combo.setCurrentIndex(idx)
+
+        self.entry_edit.setText(state.on_entry)
+        self.exit_edit.setText(state.on_exit)
+
+        # Rule edits are applied to the rules as they happen; keep copies so
+        # that cancelling the dialog can put them back
+        self._saved_rules = (list(state.rules), [replace(r) for r in state.rules])
+        self.rules_model.set_state(state, entity)
 
     def _add_rule(self):
-        rule = RuleDef(
+        self.rules_model.append_rule(RuleDef(
             signal_id=0,
             signal_name="SIG_???",
             next_state=0,
             next_state_name=""
-        )
-        self.state.rules.append(rule)
-        self._populate_rules()
-
-    def _delete_rule(self, row: int):
-        if 0 <= row < len(self.state.rules):
-            del self.state.rules[row]
-            self._populate_rules()
+        ))
 
     def accept(self):
-        # Update state
+        # Update state; the rules are already up to date via the model
+        old_id = self.state.id
         self.state.name = self.name_edit.text()
         self.state.id = self.id_spin.value()
+        self.entity._next_state_id = max(self.entity._next_state_id, self.state.id + 1)
         self.state.parent_id = self.parent_combo.currentData()
         self.state.on_entry = self.entry_edit.text()
         self.state.on_exit = self.exit_edit.text()
 
-        # Update rules from table
-        for i, rule in enumerate(self.state.rules):
-            rule.signal_name = self.rules_table.item(i, 0).text()
-            state_combo = self.rules_table.cellWidget(i, 1)
-            rule.next_state = state_combo.currentData()
-            rule.next_state_name = state_combo.currentText()
-            rule.action_name = self.rules_table.item(i, 2).text() if self.rules_table.item(i, 2) else ""
+        # States may have been renamed or deleted since the rules were written;
+        # resolve every target against the current states, dropping stale ones
+        names = {s.id: s.name for s in self.entity.states}
+        for rule in self.state.rules:
+            if rule.next_state == old_id:
+                rule.next_state = self.state.id  # self-transition follows an ID change
+            name = names.get(rule.next_state) if rule.next_state else None
+            if name is None:
+                rule.next_state = 0
+                rule.next_state_name = ""
+            else:
+                rule.next_state_name = name
+        self.entity.invalidate_actions()
 
         super().accept()
 
+    def reject(self):
+        rules, copies = self._saved_rules
+        for rule, saved in zip(rules, copies):
+            for f in fields(RuleDef):
+                setattr(rule, f.name, getattr(saved, f.name))
+        self.state.rules = rules
+        self.entity.invalidate_actions()
+        self.rules_model.set_state(self.state, self.entity)
+
+        super().reject()
+
 
 class NewEntityDialog(QDialog):
     """Dialog for creating new entity"""
@@ -878,12 +1321,11 @@ class NewEntityDialog(QDialog):
 
         layout = QFormLayout(self)
 
-        self.name_edit = QLineEdit("MyEntity")
+        self.name_edit = QLineEdit()
         layout.addRow(tr("dlg_entity_name"), self.name_edit)
 
         self.id_spin = QSpinBox()
         self.id_spin.setRange(1, 255)
-        self.id_spin.setValue(1)
         layout.addRow(tr("dlg_entity_id"), self.id_spin)
 
         buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
@@ -891,6 +1333,13 @@ class NewEntityDialog(QDialog):
         buttons.rejected.connect(self.reject)
         layout.addRow(buttons)
 
+        self.reset()
+
+    def reset(self):
+        """Restore the default name and ID before the dialog is shown again"""
+        self.name_edit.setText("MyEntity")
+        self.id_spin.setValue(1)
+
     def get_entity(self) -> EntityDef:
         return EntityDef(
             id=self.id_spin.value(),
@@ -909,135 +1358,157 @@ class NewEntityDialog(QDialog):
 class CodeGenerator:
     """Generates C code from entity definition"""
 
+    CACHE_SIZE = 32
+    _header_cache: Dict[tuple, str] = {}
+    _source_cache: Dict[tuple, str] = {}
+
+    @staticmethod
+    def header_key(entity: EntityDef) -> tuple:
+        """Everything the generated header depends on"""
+        return entity.name, entity.id, tuple((s.name, s.id) for s in entity.states)
+
     @staticmethod
-    def generate_header(entity: EntityDef) -> str:
-        lines = [
-            f"/**",
-            f" * @file {entity.name.lower()}.h",
-            f" * @brief {entity.name} entity definition",
-            f" * @note Auto-generated by MicroReactor Studio",
-            f" */",
-            f"",
-            f"#ifndef {entity.name.upper()}_H",
-            f"#define {entity.name.upper()}_H",
-            f"",
-            f"#include \"ur_types.h\"",
-            f"",
-            f"/* Entity ID */",
-            f"#define ID_{entity.name.upper()} {entity.id}",
-            f"",
-            f"/* State IDs */",
-        ]
+    def source_key(entity: EntityDef) -> tuple:
+        """Everything the generated source depends on"""
+        return entity.id, entity.name, tuple(
+            (s.id, s.name, s.parent_id, s.on_entry, s.on_exit,
+             tuple((r.signal_name, r.next_state, r.next_state_name, r.action_name) for r in s.rules))
+            for s in entity.states
+        )
+
+    @classmethod
+    def _cached(cls, cache: Dict[tuple, str], key: tuple, build, entity: EntityDef) -> str:
+        code = cache.get(key)
+        if code is None:
+            if len(cache) >= cls.CACHE_SIZE:
+                del cache[next(iter(cache))]  # drop the oldest entry
+            code = cache[key] = build(entity)
+        return code
+
+    @classmethod
+    def generate_header(cls, entity: EntityDef) -> str:
+        return cls._cached(cls._header_cache, cls.header_key(entity), cls._build_header, entity)
+
+    @classmethod
+    def generate_source(cls, entity: EntityDef, key: Optional[tuple] = None) -> str:
+        if key is None:
+            key = cls.source_key(entity)
+        return cls._cached(cls._source_cache, key, cls._build_source, entity)
+
+    @staticmethod
+    def _build_header(entity: EntityDef) -> str:
+        name = entity.name
+        nl, nu = name.lower(), name.upper()
+        buf = io.StringIO()
+        w = buf.write
+        w(f"/**\n"
+          f" * @file {nl}.h\n"
+          f" * @brief {name} entity definition\n"
+          f" * @note Auto-generated by MicroReactor Studio\n"
+          f" */\n"
+          f"\n"
+          f"#ifndef {nu}_H\n"
+          f"#define {nu}_H\n"
+          f"\n"
+          f"#include \"ur_types.h\"\n"
+          f"\n"
+          f"/* Entity ID */\n"
+          f"#define ID_{nu} {entity.id}\n"
+          f"\n"
+          f"/* State IDs */\n")
 
         for state in entity.states:
-            lines.append(f"#define {state.name} {state.id}")
+            w(f"#define {state.name} {state.id}\n")
 
-        lines.extend([
-            f"",
-            f"/* Entity declaration */",
-            f"extern ur_entity_t {entity.name.lower()}_entity;",
-            f"",
-            f"/* Initialization */",
-            f"ur_err_t {entity.name.lower()}_init(void);",
-            f"",
-            f"#endif /* {entity.name.upper()}_H */",
-        ])
+        w(f"\n"
+          f"/* Entity declaration */\n"
+          f"extern ur_entity_t {nl}_entity;\n"
+          f"\n"
+          f"/* Initialization */\n"
+          f"ur_err_t {nl}_init(void);\n"
+          f"\n"
+          f"#endif /* {nu}_H */")
 
-        return "\n".join(lines)
+        return buf.getvalue()
 
     @staticmethod
-    def generate_source(entity: EntityDef) -> str:
-        lines = [
-            f"/**",
-            f" * @file {entity.name.lower()}.c",
-            f" * @brief {entity.name} entity implementation",
-            f" * @note Auto-generated by MicroReactor Studio",
-            f" */",
-            f"",
-            f"#include \"{entity.name.lower()}.h\"",
-            f"#include \"ur_core.h\"",
-            f"",
-        ]
+    def _build_source(entity: EntityDef) -> str:
+        return "".join(CodeGenerator.iter_source(entity))
 
-        # Generate action function prototypes
-        actions = set()
-        for state in entity.states:
-            if state.on_entry:
-                actions.add(state.on_entry)
-            if state.on_exit:
-                actions.add(state.on_exit)
-            for rule in state.rules:
-                if rule.action_name:
-                    actions.add(rule.action_name)
+    @staticmethod
+    def iter_source(entity: EntityDef) -> Iterator[str]:
+        """Yield the source file in chunks, for writing without building one string"""
+        name = entity.name
+        nl, nu = name.lower(), name.upper()
+        yield (f"/**\n"
+               f" * @file {nl}.c\n"
+               f" * @brief {name} entity implementation\n"
+               f" * @note Auto-generated by MicroReactor Studio\n"
+               f" */\n"
+               f"\n"
+               f"#include \"{nl}.h\"\n"
+               f"#include \"ur_core.h\"\n"
+               f"\n")
+
+        actions = entity.actions()
 
+        # Generate action function prototypes
         if actions:
-            lines.append("/* Action function prototypes */")
-            for action in sorted(actions):
-                lines.append(f"static uint16_t {action}(ur_entity_t *ent, const ur_signal_t *sig);")
-            lines.append("")
+            yield "/* Action function prototypes */\n"
+            for action in actions:
+                yield f"static uint16_t {action}(ur_entity_t *ent, const ur_signal_t *sig);\n"
+            yield "\n"
 
-        # Generate rules for each state
-        for state in entity.states:
-            lines.append(f"/* Rules for {state.name} */")
-            lines.append(f"static const ur_rule_t {state.name.lower()}_rules[] = {{")
+        # Each state's rule table is named once here and referenced again below
+        states = [(state, f"{state.name.lower()}_rules") for state in entity.states]
 
+        # Generate rules for each state
+        for state, rules_ref in states:
+            yield f"/* Rules for {state.name} */\n"
+            yield f"static const ur_rule_t {rules_ref}[] = {{\n"
             for rule in state.rules:
-                action = rule.action_name if rule.action_name else "NULL"
-                next_state = rule.next_state_name if rule.next_state else "0"
-                lines.append(f"    UR_RULE({rule.signal_name}, {next_state}, {action}),")
-
-            lines.append("    UR_RULE_END")
-            lines.append("};")
-            lines.append("")
+                yield (f"    UR_RULE({rule.signal_name}, {rule.next_state_name if rule.next_state else '0'}, "
+                       f"{rule.action_name or 'NULL'}),\n")
+            yield ("    UR_RULE_END\n"
+                   "};\n"
+                   "\n")
 
         # Generate state definitions
-        lines.append("/* State definitions */")
-        lines.append(f"static const ur_state_def_t {entity.name.lower()}_states[] = {{")
-
-        for state in entity.states:
-            entry = state.on_entry if state.on_entry else "NULL"
-            exit_fn = state.on_exit if state.on_exit else "NULL"
-            parent = state.parent_id if state.parent_id else "0"
-            lines.append(f"    UR_STATE({state.name}, {parent}, {entry}, {exit_fn}, {state.name.lower()}_rules),")
-
-        lines.append("};")
-        lines.append("")
+        yield "/* State definitions */\n"
+        yield f"static const ur_state_def_t {nl}_states[] = {{\n"
+        for state, rules_ref in states:
+            yield (f"    UR_STATE({state.name}, {state.parent_id or '0'}, {state.on_entry or 'NULL'}, "
+                   f"{state.on_exit or 'NULL'}, {rules_ref}),\n")
+        yield ("};\n"
+               "\n")
 
         # Generate entity instance
-        lines.extend([
-            f"/* Entity instance */",
-            f"ur_entity_t {entity.name.lower()}_entity;",
-            f"",
-            f"/* Initialization */",
-            f"ur_err_t {entity.name.lower()}_init(void) {{",
-            f"    ur_entity_config_t config = {{",
-            f"        .id = ID_{entity.name.upper()},",
-            f"        .name = \"{entity.name}\",",
-            f"        .states = {entity.name.lower()}_states,",
-            f"        .state_count = sizeof({entity.name.lower()}_states) / sizeof({entity.name.lower()}_states[0]),",
-            f"        .initial_state = {entity.states[0].name if entity.states else '1'},",
-            f"        .user_data = NULL,",
-            f"    }};",
-            f"    return ur_init(&{entity.name.lower()}_entity, &config);",
-            f"}}",
-            f"",
-        ])
+        yield (f"/* Entity instance */\n"
+               f"ur_entity_t {nl}_entity;\n"
+               f"\n"
+               f"/* Initialization */\n"
+               f"ur_err_t {nl}_init(void) {{\n"
+               f"    ur_entity_config_t config = {{\n"
+               f"        .id = ID_{nu},\n"
+               f"        .name = \"{name}\",\n"
+               f"        .states = {nl}_states,\n"
+               f"        .state_count = sizeof({nl}_states) / sizeof({nl}_states[0]),\n"
+               f"        .initial_state = {entity.states[0].name if entity.states else '1'},\n"
+               f"        .user_data = NULL,\n"
+               f"    }};\n"
+               f"    return ur_init(&{nl}_entity, &config);\n"
+               f"}}\n")
 
         # Generate action function stubs
         if actions:
-            lines.append("/* Action function implementations */")
-            for action in sorted(actions):
-                lines.extend([
-                    f"static uint16_t {action}(ur_entity_t *ent, const ur_signal_t *sig) {{",
-                    f"    (void)ent;",
-                    f"    (void)sig;",
-                    f"    // TODO: Implement {action}",
-                    f"    return 0;",
-                    f"}}",
-                    f"",
-                ])
-
-        return "\n".join(lines)
+            yield "\n/* Action function implementations */"
+            for action in actions:
+                yield (f"\nstatic uint16_t {action}(ur_entity_t *ent, const ur_signal_t *sig) {{\n"
+                       f"    (void)ent;\n"
+                       f"    (void)sig;\n"
+                       f"    // TODO: Implement {action}\n"
+                       f"    return 0;\n"
+                       f"}}\n")
 
 
 # =============================================================================
@@ -1047,6 +1518,8 @@ class CodeGenerator:
 class ReactorStudio(QMainWindow):
     """Main window for MicroReactor Studio"""
 
+    PREVIEW_DELAY_MS = 150  # Edits closer together than this share one preview refresh
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle(tr("title"))
@@ -1055,6 +1528,18 @@ class ReactorStudio(QMainWindow):
         self.project = Project()
         self.current_entity: Optional[EntityDef] = None
         self.current_file: Optional[str] = None
+        # Dialogs are built on first use and reused afterwards
+        self._state_dlg: Optional[StateEditorDialog] = None
+        self._entity_dlg: Optional[NewEntityDialog] = None
+
+        # Code preview regeneration is coalesced across rapid edits
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(self.PREVIEW_DELAY_MS)
+        self._preview_timer.timeout.connect(self._do_update_code_preview)
+        self._batching = 0  # Nesting depth of _batch; preview is held while > 0
+        self._last_preview_key: Optional[tuple] = None
+        self._preview_dirty = False  # A refresh was skipped while the preview was hidden
 
         self._create_actions()
         self._create_menus()
@@ -1154,6 +1639,7 @@ class ReactorStudio(QMainWindow):
     def _create_ui(self):
         # Central widget with splitter
         splitter = QSplitter()
+        splitter.splitterMoved.connect(self._on_splitter_moved)
         self.setCentralWidget(splitter)
 
         # Left panel - Entity tree
@@ -1166,6 +1652,8 @@ class ReactorStudio(QMainWindow):
         self.entity_tree = QTreeWidget()
         self.entity_tree.setHeaderHidden(True)
         self.entity_tree.itemClicked.connect(self._on_entity_selected)
+        self._entity_items: Dict[int, QTreeWidgetItem] = {}  # id(entity) -> tree item
+        self._state_items: Dict[int, QTreeWidgetItem] = {}  # id(state) -> tree item
         left_layout.addWidget(self.entity_tree)
 
         self.new_entity_btn = QPushButton(tr("btn_new_entity"))
@@ -1178,11 +1666,18 @@ class ReactorStudio(QMainWindow):
         self.scene = StateMachineScene()
         self.scene.state_selected.connect(self._on_state_selected)
         self.scene.status_message.connect(self._on_status_message)
+        self.scene.items_deleted.connect(self._on_items_deleted)
 
         self.view = QGraphicsView(self.scene)
         self.view.setRenderHint(QPainter.Antialiasing)
         self.view.setDragMode(QGraphicsView.RubberBandDrag)
-        self.view.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+        # Items report exact bounds, so only the changed regions need repainting
+        self.view.setViewportUpdateMode(QGraphicsView.MinimalViewportUpdate)
+        # Built-in items set their own pen/brush, and every item's bounds already
+        # include its pen, so the per-item save/restore and AA padding are not needed
+        self.view.setOptimizationFlags(
+            QGraphicsView.DontSavePainterState | QGraphicsView.DontAdjustForAntialiasing
+        )
         splitter.addWidget(self.view)
 
         # Right panel - Properties
@@ -1192,16 +1687,19 @@ class ReactorStudio(QMainWindow):
 
         self.properties_label = QLabel(tr("properties"))
         right_layout.addWidget(self.properties_label)
-        self.properties_text = QTextEdit()
+        self.properties_text = QPlainTextEdit()
         self.properties_text.setReadOnly(True)
+        self.properties_text.setUndoRedoEnabled(False)
         right_layout.addWidget(self.properties_text)
 
         # Code preview
         self.code_preview_label = QLabel(tr("code_preview"))
         right_layout.addWidget(self.code_preview_label)
-        self.code_preview = QTextEdit()
+        self.code_preview = QPlainTextEdit()
         self.code_preview.setReadOnly(True)
-        self.code_preview.setFontFamily("Consolas")
+        self.code_preview.setUndoRedoEnabled(False)
+        self.code_preview.setFont(QFont("Consolas"))
+        self.code_preview.setLineWrapMode(QPlainTextEdit.NoWrap)
         right_layout.addWidget(self.code_preview)
 
         splitter.addWidget(right_panel)
@@ -1219,18 +1717,47 @@ class ReactorStudio(QMainWindow):
             "语言已切换，重启后生效。\nLanguage changed. Restart to apply.")
 
     def _update_entity_tree(self):
-        self.entity_tree.clear()
-        for entity in self.project.entities:
-            item = QTreeWidgetItem([entity.name])
-            item.setData(0, Qt.UserRole, entity)
+        """Rebuild the whole tree; used when the project itself is replaced"""
+        tree = self.entity_tree
+        tree.setUpdatesEnabled(False)
+        tree.blockSignals(True)
+        try:
+            tree.clear()
+            self._entity_items.clear()
+            self._state_items.clear()
+            tree.addTopLevelItems([self._make_entity_item(entity) for entity in self.project.entities])
+            tree.expandAll()
+        finally:
+            tree.blockSignals(False)
+            tree.setUpdatesEnabled(True)
+
+    def _make_entity_item(self, entity: EntityDef) -> QTreeWidgetItem:
+        item = QTreeWidgetItem([entity.name])
+        item.setData(0, Qt.UserRole, entity)
+        item.addChildren([self._make_state_item(state) for state in entity.states])
+        self._entity_items[id(entity)] = item
+        return item
 
-            for state in entity.states:
-                state_item = QTreeWidgetItem([state.name])
-                state_item.setData(0, Qt.UserRole, state)
-                item.addChild(state_item)
+    def _make_state_item(self, state: StateDef) -> QTreeWidgetItem:
+        item = QTreeWidgetItem([state.name])
+        item.setData(0, Qt.UserRole, state)
+        self._state_items[id(state)] = item
+        return item
 
-            self.entity_tree.addTopLevelItem(item)
-            item.setExpanded(True)
+    def _add_entity_to_tree(self, entity: EntityDef):
+        item = self._make_entity_item(entity)
+        self.entity_tree.addTopLevelItem(item)
+        item.setExpanded(True)
+
+    def _add_state_to_tree(self, entity: EntityDef, state: StateDef):
+        entity_item = self._entity_items.get(id(entity))
+        if entity_item is not None:
+            entity_item.addChild(self._make_state_item(state))
+
+    def _remove_state_from_tree(self, state: StateDef):
+        item = self._state_items.pop(id(state), None)
+        if item is not None:
+            item.parent().removeChild(item)
 
     def _on_entity_selected(self, item: QTreeWidgetItem, column: int):
         data = item.data(0, Qt.UserRole)
@@ -1250,22 +1777,87 @@ class ReactorStudio(QMainWindow):
 
     def _on_state_selected(self, state: StateDef):
         if self.current_entity:
-            dialog = StateEditorDialog(state, self.current_entity, self)
+            if self._state_dlg is None:
+                self._state_dlg = StateEditorDialog(parent=self)
+            dialog = self._state_dlg
+            dialog.load(state, self.current_entity)
+            before = self._state_layout_key(state)
             if dialog.exec():
-                self.scene.load_entity(self.current_entity)
-                self._update_entity_tree()
+                if self._state_layout_key(state) != before:
+                    # ID or transitions changed; rebuild the diagram
+                    self.scene.load_entity(self.current_entity)
+                else:
+                    item = self.scene.state_items.get(state.id)
+                    if item is not None:
+                        item.set_name(state.name)
+                self._refresh_state_item(state)
                 self._update_code_preview()
 
+    @staticmethod
+    def _state_layout_key(state: StateDef) -> tuple:
+        """What a state edit can change that affects the drawn items besides the name"""
+        return state.id, [(id(r), r.signal_name, r.next_state) for r in state.rules]
+
+    def _refresh_state_item(self, state: StateDef):
+        """Update the tree row of one state in place"""
+        item = self._state_items.get(id(state))
+        if item is not None:
+            item.setText(0, state.name)
+
+    def _on_items_deleted(self, states: List[StateDef]):
+        """Follow deletions made in the scene, from the toolbar or a context menu"""
+        for state in states:
+            self._remove_state_from_tree(state)
+        self._update_code_preview()
+
     def _on_status_message(self, message: str):
         """Handle status messages from the scene"""
         self.statusBar().showMessage(message)
         # Also update the toggle button state if transition mode was cancelled
         if message == tr("ready") and self.add_transition_action.isChecked():
             self.add_transition_action.setChecked(False)
+            # Pick up the transitions drawn in this session
+            self._update_code_preview()
+
+    def _on_splitter_moved(self, pos: int, index: int):
+        if self._preview_dirty:
+            self._update_code_preview()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._preview_dirty:
+            self._update_code_preview()
 
     def _update_code_preview(self):
+        """Schedule a code preview refresh"""
+        self._preview_timer.start()
+
+    @contextmanager
+    def _batch(self):
+        """Hold code preview refreshes until a multi-step edit is finished"""
+        self._batching += 1
+        try:
+            yield
+        finally:
+            self._batching -= 1
+            if self._batching == 0:
+                self._update_code_preview()
+
+    def _do_update_code_preview(self):
+        if self._batching:
+            return
+        if self.code_preview.visibleRegion().isEmpty():
+            # Hidden or collapsed; regenerate once it is shown again
+            self._preview_dirty = True
+            return
+        self._preview_dirty = False
         if self.current_entity:
-            code = CodeGenerator.generate_source(self.current_entity)
+            # Skip regenerating and re-laying out text that would not change
+            key = CodeGenerator.source_key(self.current_entity)
+            if key == self._last_preview_key:
+                return
+            self._last_preview_key = key
+            code = CodeGenerator.generate_source(self.current_entity, key)
             self.code_preview.setPlainText(code)
 
     # Actions
@@ -1276,6 +1868,7 @@ class ReactorStudio(QMainWindow):
         self.scene.clear()
         self._update_entity_tree()
         self.code_preview.clear()
+        self._last_preview_key = None
         self.setWindowTitle(tr("title") + " - " + tr("new_project"))
 
     def open_project(self):
@@ -1284,45 +1877,8 @@ class ReactorStudio(QMainWindow):
         )
         if filename:
             try:
-                with open(filename, 'r') as f:
-                    data = json.load(f)
-
-                self.project = Project(
-                    name=data.get('name', 'Untitled'),
-                    version=data.get('version', '1.0')
-                )
-
-                for ent_data in data.get('entities', []):
-                    entity = EntityDef(
-                        id=ent_data['id'],
-                        name=ent_data['name'],
-                        initial_state=ent_data.get('initial_state', 1)
-                    )
-
-                    for state_data in ent_data.get('states', []):
-                        state = StateDef(
-                            id=state_data['id'],
-                            name=state_data['name'],
-                            parent_id=state_data.get('parent_id', 0),
-                            on_entry=state_data.get('on_entry', ''),
-                            on_exit=state_data.get('on_exit', ''),
-                            x=state_data.get('x', 0),
-                            y=state_data.get('y', 0)
-                        )
-
-                        for rule_data in state_data.get('rules', []):
-                            rule = RuleDef(
-                                signal_id=rule_data.get('signal_id', 0),
-                                signal_name=rule_data.get('signal_name', ''),
-                                next_state=rule_data.get('next_state', 0),
-                                next_state_name=rule_data.get('next_state_name', ''),
-                                action_name=rule_data.get('action_name', '')
-                            )
-                            state.rules.append(rule)
-
-                        entity.states.append(state)
-
-                    self.project.entities.append(entity)
+                data = _loads(Path(filename).read_bytes())
+                self.project = project_from_dict(data)
 
                 self.current_file = filename
                 self._update_entity_tree()
@@ -1351,48 +1907,14 @@ class ReactorStudio(QMainWindow):
 
     def _save_to_file(self, filename: str):
         try:
-            data = {
-                'name': self.project.name,
-                'version': self.project.version,
-                'entities': []
-            }
-
-            for entity in self.project.entities:
-                ent_data = {
-                    'id': entity.id,
-                    'name': entity.name,
-                    'initial_state': entity.initial_state,
-                    'states': []
-                }
-
-                for state in entity.states:
-                    state_data = {
-                        'id': state.id,
-                        'name': state.name,
-                        'parent_id': state.parent_id,
-                        'on_entry': state.on_entry,
-                        'on_exit': state.on_exit,
-                        'x': state.x,
-                        'y': state.y,
-                        'rules': []
-                    }
-
-                    for rule in state.rules:
-                        rule_data = {
-                            'signal_id': rule.signal_id,
-                            'signal_name': rule.signal_name,
-                            'next_state': rule.next_state,
-                            'next_state_name': rule.next_state_name,
-                            'action_name': rule.action_name
-                        }
-                        state_data['rules'].append(rule_data)
-
-                    ent_data['states'].append(state_data)
-
-                data['entities'].append(ent_data)
-
-            with open(filename, 'w') as f:
-                json.dump(data, f, indent=2)
+            data = asdict(self.project)
+            if HAS_ORJSON:
+                Path(filename).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            else:
+                # Same layout as orjson's OPT_INDENT_2, so saved files do not
+                # depend on which backend is installed
+                Path(filename).write_text(json.dumps(data, indent=2, ensure_ascii=False),
+                                          encoding='utf-8')
 
             self.statusBar().showMessage(tr("msg_saved", path=filename))
 
@@ -1407,17 +1929,18 @@ class ReactorStudio(QMainWindow):
         directory = QFileDialog.getExistingDirectory(self, tr("export_code"))
         if directory:
             try:
-                # Generate header
-                header = CodeGenerator.generate_header(self.current_entity)
-                header_path = Path(directory) / f"{self.current_entity.name.lower()}.h"
-                with open(header_path, 'w') as f:
-                    f.write(header)
-
-                # Generate source
-                source = CodeGenerator.generate_source(self.current_entity)
-                source_path = Path(directory) / f"{self.current_entity.name.lower()}.c"
-                with open(source_path, 'w') as f:
-                    f.write(source)
+                entity = self.current_entity
+                name = entity.name.lower()
+
+                # Generate header and source; UTF-8 with LF on every platform
+                header_path = Path(directory) / f"{name}.h"
+                header_path.write_text(CodeGenerator.generate_header(entity),
+                                       encoding='utf-8', newline='\n')
+
+                # Stream the source rather than building it as one string first
+                source_path = Path(directory) / f"{name}.c"
+                with open(source_path, 'w', encoding='utf-8', newline='\n', buffering=1 << 16) as f:
+                    f.writelines(CodeGenerator.iter_source(entity))
 
                 QMessageBox.information(
                     self, tr("msg_export_done"),
@@ -1428,11 +1951,14 @@ class ReactorStudio(QMainWindow):
                 QMessageBox.critical(self, tr("error"), tr("msg_export_failed", e=e))
 
     def new_entity(self):
-        dialog = NewEntityDialog(self)
+        if self._entity_dlg is None:
+            self._entity_dlg = NewEntityDialog(self)
+        dialog = self._entity_dlg
+        dialog.reset()
         if dialog.exec():
             entity = dialog.get_entity()
             self.project.entities.append(entity)
-            self._update_entity_tree()
+            self._add_entity_to_tree(entity)
             self.current_entity = entity
             self.scene.load_entity(entity)
 
@@ -1440,9 +1966,9 @@ class ReactorStudio(QMainWindow):
         if self.current_entity:
             # Add at center of view
             center = self.view.mapToScene(self.view.viewport().rect().center())
-            self.scene.add_state(center.x(), center.y())
-            self._update_entity_tree()
-            self._update_code_preview()
+            with self._batch():
+                item = self.scene.add_state(center.x(), center.y())
+                self._add_state_to_tree(self.current_entity, item.state)
 
     def toggle_transition_mode(self, checked: bool):
         """Toggle transition creation mode (two-click method)"""
@@ -1453,6 +1979,8 @@ class ReactorStudio(QMainWindow):
         else:
             self.view.setDragMode(QGraphicsView.RubberBandDrag)
             self.statusBar().showMessage(tr("ready"))
+            # Pick up the transitions drawn in this session
+            self._update_code_preview()
 
     def _transition_mouse_press(self, event):
         # This method is no longer used - transition handling is now in the scene
@@ -1460,8 +1988,6 @@ class ReactorStudio(QMainWindow):
 
     def delete_selected(self):
         self.scene.delete_selected()
-        self._update_entity_tree()
-        self._update_code_preview()
 
 
 # =============================================================================
@@ -1474,6 +2000,7 @@ def main():
 
     window = ReactorStudio()
     window.show()
+    app.processEvents()  # paint the first frame before entering the event loop
 
     sys.exit(app.exec())
 